@@ -519,7 +519,7 @@ with st.expander("🗂 Project Library & 🤖 Quick Estimate  ─  click to expa
                     if total_clusters:
                         with st.expander("View learned dimension clusters"):
                             for etype, clusters in cprof.items():
-                                if clusters:
+                                if len(clusters):
                                     st.markdown(f"**{etype}** — {len(clusters)} sizes")
                                     st.dataframe(
                                         pd.DataFrame(clusters).rename(columns={
@@ -593,18 +593,18 @@ with st.expander("🗂 Project Library & 🤖 Quick Estimate  ─  click to expa
             }
             dm = pd.DataFrame(dim_data)
             # Add formwork area and cost columns
-            from estimator import _formwork_area
-            dm['Formwork Area (m²)'] = dm.apply(
-                lambda r: round(_formwork_area(r['Type'], r['Length'], r['Width'], r['Height']), 2), axis=1)
+            from estimator import _formwork_area_vec
+            dm['Formwork Area (m²)'] = _formwork_area_vec(
+                dm['Type'], dm['Length'], dm['Width'], dm['Height']).round(2)
             dm['Cost/Element (₹)'] = (dm['Formwork Area (m²)'] * q_rate).round(0).astype(int)
             st.dataframe(dm, use_container_width=False, hide_index=True)
 
             # Show cluster profiles if available
             cprof = est.get('cluster_profiles')
-            if cprof and any(cprof.values()):
+            if cprof and any(len(v) for v in cprof.values()):
                 with st.expander("📐 Learned Dimension Clusters (from training CSVs)"):
                     for etype, clusters in cprof.items():
-                        if clusters:
+                        if len(clusters):
                             st.markdown(f"**{etype}** — {len(clusters)} unique sizes learned")
                             st.dataframe(
                                 pd.DataFrame(clusters).rename(columns={
@@ -675,7 +675,7 @@ df_clustered, df_summary = detect_repetitions(df_elements)
 
 zone_col = 'Zone' if (enable_zones and 'Zone' in df_clustered.columns) else None
 
-with st.spinner("Running PuLP optimisation…"):
+with st.spinner("Running optimisation…"):
     df_opt = optimize_formwork_sets(
         df_clustered,
         reuse_cycle_days=reuse_cycle,
@@ -772,7 +772,7 @@ st.divider()
 # (Feature 1: Write-off columns · Feature 2: Zone column)
 # ══════════════════════════════════════════════════════════════════════════════
 st.markdown(section_header(2, "Procurement Optimisation Results",
-                           f"PuLP LP · {reuse_cycle}-day effective cycle"
+                           f"Peak-demand optimum · {reuse_cycle}-day effective cycle"
                            + (f" · Max {max_reuse_count} uses/set" if enable_life_limit else "")
                            + (" · Zone-split inventory" if zone_col else "")),
             unsafe_allow_html=True)
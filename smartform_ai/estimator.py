@@ -10,31 +10,32 @@ Changes from v1:
   - When trained, the estimator reproduces realistic dimension *clusters* —
     not a single averaged dimension per type.
 
-Model: RandomForestRegressor → MultiOutputRegressor
+Model: RandomForestRegressor (native multi-output); MultiOutputRegressor(LinearRegression) below 10 projects
 Fallback: AEC construction norms (hardcoded priors)
 """
 import os
-import pickle
 import json
 import numpy as np
 import pandas as pd
-from datetime import datetime, timedelta
+from datetime import datetime
+from importlib.util import find_spec
 
-try:
-    from sklearn.ensemble import RandomForestRegressor
-    from sklearn.linear_model import LinearRegression
-    from sklearn.preprocessing import LabelEncoder
-    from sklearn.multioutput import MultiOutputRegressor
-    from sklearn.metrics import mean_absolute_percentage_error
-    SKLEARN_OK = True
-except ImportError:
-    SKLEARN_OK = False
+# scikit-learn (and joblib, which ships with it) is slow to import, so only
+# check it is installed here; train() and _load_model() import on first use.
+SKLEARN_OK = find_spec('sklearn') is not None and find_spec('joblib') is not None
 
-from project_library import get_training_dataframe, LIBRARY_DIR
+# Optional accelerators: lz4 codec for model files, pyarrow CSV parser
+_MODEL_COMPRESS = ('lz4', 3) if find_spec('lz4') else ('zlib', 3)
+_CSV_ENGINE     = 'pyarrow' if find_spec('pyarrow') else 'c'
+
+from project_library import get_training_dataframe, iter_projects, registry_version, LIBRARY_DIR
 
 MODEL_PATH   = os.path.join(os.path.dirname(__file__), "project_library", "estimator_model.pkl")
 CLUSTER_PATH = os.path.join(os.path.dirname(__file__), "project_library", "cluster_profiles.json")
 
+# Unpickled model package keyed by (MODEL_PATH, mtime)
+_MODEL_CACHE: dict = {}
+
 
 # ── Default AEC norms (fallback when no training data) ────────────────────────
 _PRIORS = {
@@ -65,15 +66,18 @@ DEFAULT_RATE_PER_M2 = 350.0    # reasonable Indian market avg for steel/ply form
 
 
 # ── Formwork area computation (mirror of boq_generator.py) ────────────────────
+def _formwork_area_vec(etype, L, W, H) -> np.ndarray:
+    """Compute formwork contact area (m²) for arrays of elements."""
+    etype = np.asarray(etype)
+    L, W, H = (np.asarray(a, dtype=np.float64) for a in (L, W, H))
+    return np.where(etype == 'Column', 2 * (L + W) * H,
+           np.where(etype == 'Slab',   L * W,
+           np.where(etype == 'Beam',   2 * (L + H) * W, 0.0)))
+
+
 def _formwork_area(etype: str, L: float, W: float, H: float) -> float:
     """Compute formwork contact area (m²) for a single element."""
-    if etype == 'Column':
-        return 2 * (L + W) * H
-    elif etype == 'Slab':
-        return L * W
-    elif etype == 'Beam':
-        return 2 * (L + H) * W
-    return 0.0
+    return float(_formwork_area_vec(etype, L, W, H))
 
 
 def cost_from_area(etype: str, L: float, W: float, H: float,
@@ -93,97 +97,173 @@ TARGET_COLS = [
 
 
 # ── Cluster profile extraction (from real CSVs) ──────────────────────────────
+_DIM_COLS     = ['Length', 'Width', 'Height']
+_PROFILE_COLS = ['Type'] + _DIM_COLS
+_PROFILE_DTYPES = {'Type': 'category', 'Length': 'float32',
+                   'Width': 'float32', 'Height': 'float32'}
+
+# Incremental state for _extract_cluster_profiles: the parsed registry and,
+# per project CSV, its mtime and Type/L/W/H counts (None if unreadable)
+_PROFILE_CACHE: dict = {
+    'reg_mtime': None, 'registry': None,
+    'csv_mtimes': {}, 'per_csv_counts': {}, 'profiles': None,
+}
+
+# One record per learned dimension cluster
+_PROFILE_DTYPE = np.dtype([('L', 'f4'), ('W', 'f4'), ('H', 'f4'), ('count', 'i4')])
+
+
+def _profile_array(profile) -> np.ndarray:
+    """Coerce a cluster profile (structured array or legacy list of dicts) to an array."""
+    if profile is None:
+        return np.empty(0, dtype=_PROFILE_DTYPE)
+    if isinstance(profile, np.ndarray):
+        return profile
+    return np.array([(p['L'], p['W'], p['H'], p['count']) for p in profile],
+                    dtype=_PROFILE_DTYPE)
+
+
+def _profiles_to_json(profiles: dict) -> dict:
+    """Structured-array profiles → JSON-friendly {etype: [{L, W, H, count}, ...]}."""
+    return {
+        etype: [{'L': round(float(r['L']), 3), 'W': round(float(r['W']), 3),
+                 'H': round(float(r['H']), 3), 'count': int(r['count'])}
+                for r in _profile_array(arr)]
+        for etype, arr in profiles.items()
+    }
+
+
+def _csv_dim_counts(csv_path: str) -> pd.DataFrame:
+    """Count elements per Type × L×W×H (3 dp) in one project CSV."""
+    df = pd.read_csv(csv_path, usecols=_PROFILE_COLS, dtype=_PROFILE_DTYPES,
+                     engine=_CSV_ENGINE)
+    df[_DIM_COLS] = df[_DIM_COLS].astype(float).round(3)
+    return df.groupby(_PROFILE_COLS, observed=True).size().reset_index(name='count')
+
 
 def _extract_cluster_profiles() -> dict:
     """
     Walk every project in the library and extract per-type dimension clusters.
     Returns
-        { 'Column': [ {'L':0.5, 'W':0.5, 'H':3.0, 'count':12}, ... ],
-          'Slab':   [ ... ],
-          'Beam':   [ ... ] }
-    Merged across all projects.
+        { 'Column': array([(0.5, 0.5, 3.0, 12), ...], dtype=_PROFILE_DTYPE),
+          'Slab':   array([...]),
+          'Beam':   array([...]) }
+    Merged across all projects, sorted by count descending.
+    Only CSVs whose mtime changed since the last call are re-parsed.
     """
-    profiles: dict = {'Column': [], 'Slab': [], 'Beam': []}
+    profiles: dict = {etype: _profile_array(None) for etype in ('Column', 'Slab', 'Beam')}
 
     if not os.path.exists(LIBRARY_DIR):
         return profiles
 
-    registry_path = os.path.join(LIBRARY_DIR, 'registry.json')
-    if not os.path.exists(registry_path):
+    reg_mtime = registry_version()
+    if reg_mtime is None:
         return profiles
 
-    with open(registry_path, encoding='utf-8') as f:
-        registry = json.load(f)
-
-    for proj in registry:
-        csv_path = os.path.join(LIBRARY_DIR, proj['project_id'], 'structural_elements.csv')
-        if not os.path.exists(csv_path):
+    cache = _PROFILE_CACHE
+    reg_changed = reg_mtime != cache['reg_mtime']
+    if reg_changed:
+        cache['registry'] = list(iter_projects())
+        cache['reg_mtime'] = reg_mtime
+
+    csv_paths = [
+        os.path.join(LIBRARY_DIR, proj.get('id') or proj.get('project_id', ''),
+                     'structural_elements.csv')
+        for proj in cache['registry']
+    ]
+    csv_mtimes = {p: os.path.getmtime(p) for p in csv_paths if os.path.exists(p)}
+    if (not reg_changed and cache['profiles'] is not None
+            and csv_mtimes == cache['csv_mtimes']):
+        return dict(cache['profiles'])
+
+    frames = []
+    per_csv_counts = {}
+    for i, csv_path in enumerate(csv_paths):
+        if csv_path not in csv_mtimes:
             continue
-        try:
-            df = pd.read_csv(csv_path)
-        except Exception:
-            continue
-
-        for etype in profiles:
-            sub = df[df['Type'] == etype] if 'Type' in df.columns else pd.DataFrame()
-            if sub.empty:
-                continue
-            # Group by dimension triplet
-            dim_cols = [c for c in ['Length', 'Width', 'Height'] if c in sub.columns]
-            if len(dim_cols) < 3:
-                continue
-            for dims, grp in sub.groupby(dim_cols):
-                L, W, H = dims
-                profiles[etype].append({
-                    'L': round(float(L), 3),
-                    'W': round(float(W), 3),
-                    'H': round(float(H), 3),
-                    'count': len(grp),
-                })
-
-    # Deduplicate: merge identical L×W×H by summing count
-    for etype in profiles:
-        merged: dict = {}
-        for item in profiles[etype]:
-            key = (item['L'], item['W'], item['H'])
-            if key in merged:
-                merged[key]['count'] += item['count']
-            else:
-                merged[key] = dict(item)
-        profiles[etype] = list(merged.values())
-        # Sort by count descending
-        profiles[etype].sort(key=lambda x: -x['count'])
-
-    return profiles
+        if (csv_path in cache['per_csv_counts']
+                and cache['csv_mtimes'].get(csv_path) == csv_mtimes[csv_path]):
+            counts = cache['per_csv_counts'][csv_path]
+        else:
+            try:
+                counts = _csv_dim_counts(csv_path)
+            except Exception:
+                counts = None       # unreadable or missing Type/L/W/H columns
+        per_csv_counts[csv_path] = counts
+        if counts is not None:
+            frames.append(counts.assign(_proj=i))
+    cache['csv_mtimes'], cache['per_csv_counts'] = csv_mtimes, per_csv_counts
+
+    if frames:
+        _merge_dim_counts(frames, profiles)
+    cache['profiles'] = profiles
+    return dict(profiles)
+
+
+def _merge_dim_counts(frames: list, profiles: dict):
+    """
+    Sum per-project Type/L/W/H counts into profiles (in place) — identical
+    L×W×H across projects collapse into a single cluster.
+    """
+    df_all = pd.concat(frames, ignore_index=True)
+    df_all = df_all[df_all['Type'].isin(list(profiles))]
+    counts = (
+        df_all.groupby(_PROFILE_COLS, sort=False, observed=True)
+              .agg(count=('count', 'sum'), first_proj=('_proj', 'min'))
+              .reset_index()
+    )
+
+    for etype, g in counts.groupby('Type', sort=False, observed=True):
+        # Sort by count descending; ties keep library order, then dimensions
+        order = np.lexsort((g['Height'].values, g['Width'].values, g['Length'].values,
+                            g['first_proj'].values, -g['count'].values))
+        arr = np.empty(len(g), dtype=_PROFILE_DTYPE)
+        arr['L'], arr['W'], arr['H'] = (g[c].values[order] for c in _DIM_COLS)
+        arr['count'] = g['count'].values[order]
+        profiles[etype] = arr
 
 
 # ── Training ──────────────────────────────────────────────────────────────────
 
-def _encode_features(df: pd.DataFrame, le: "LabelEncoder" = None):
-    """Convert building_type to int, return (X, le)."""
-    df = df.copy()
-    if le is None:
-        le = LabelEncoder()
-        df['btype_enc'] = le.fit_transform(df['building_type'].astype(str))
+def _encode_features(df: pd.DataFrame, bt_index: dict = None):
+    """Convert building_type to int codes, return (X, bt_index)."""
+    btype = df['building_type'].astype(str)
+    if bt_index is None:
+        cats = pd.Categorical(btype)
+        bt_index = {c: i for i, c in enumerate(cats.categories)}
+        codes = cats.codes
     else:
-        known = set(le.classes_)
-        df['building_type'] = df['building_type'].apply(
-            lambda x: x if x in known else le.classes_[0])
-        df['btype_enc'] = le.transform(df['building_type'].astype(str))
+        # Unknown building types fall back to the first known class (code 0)
+        codes = btype.map(bt_index).fillna(0).values
+
+    X = np.column_stack([
+        codes, df['floors'].values, df['floor_area_m2'].values, df['duration_days'].values,
+    ]).astype(float)
+    return X, bt_index
 
-    X = df[['btype_enc', 'floors', 'floor_area_m2', 'duration_days']].values.astype(float)
-    return X, le
+
+def _bt_index(pkg: dict) -> dict:
+    """building_type → code lookup, also for packages saved with a LabelEncoder."""
+    if 'bt_index' in pkg:
+        return pkg['bt_index']
+    return {c: i for i, c in enumerate(pkg['le'].classes_)}
 
 
 def train(force: bool = False) -> dict:
     """
     Train the estimator on the project library's **real CSV data**.
     Also extracts cluster profiles for dimension diversity in estimates.
-    Returns a dict with model, encoder, n_samples, score, and cluster profiles.
+    Returns a dict with model, building-type index, n_samples, score, and cluster profiles.
     """
     if not SKLEARN_OK:
         return {'error': 'scikit-learn not installed'}
 
+    import joblib
+    from sklearn.ensemble import RandomForestRegressor
+    from sklearn.linear_model import LinearRegression
+    from sklearn.multioutput import MultiOutputRegressor
+    from sklearn.metrics import mean_absolute_percentage_error
+
     df = get_training_dataframe()
 
     if df.empty or len(df) < 2:
@@ -193,16 +273,15 @@ def train(force: bool = False) -> dict:
     if 'n_clusters' not in df.columns:
         df['n_clusters'] = df['n_columns'] + df['n_slabs'] + df['n_beams']
 
-    X, le = _encode_features(df)
+    X, bt_index = _encode_features(df)
     Y     = df[TARGET_COLS].fillna(0).values
 
-    # Choose model based on dataset size
+    # Choose model based on dataset size.  RandomForest is natively
+    # multi-output: one forest whose leaves hold all targets.
     if len(df) >= 10:
-        base = RandomForestRegressor(n_estimators=100, random_state=42)
+        model = RandomForestRegressor(n_estimators=100, n_jobs=-1, random_state=42)
     else:
-        base = LinearRegression()
-
-    model = MultiOutputRegressor(base)
+        model = MultiOutputRegressor(LinearRegression())
     model.fit(X, Y)
 
     # In-sample MAPE as rough quality indicator
@@ -216,25 +295,31 @@ def train(force: bool = False) -> dict:
     cluster_profiles = _extract_cluster_profiles()
 
     package = {
-        'model': model, 'le': le,
+        'model': model,
+        'bt_classes': list(bt_index), 'bt_index': bt_index,
         'n_samples': len(df), 'score': score,
         'cluster_profiles': cluster_profiles,
     }
     os.makedirs(os.path.dirname(MODEL_PATH), exist_ok=True)
-    with open(MODEL_PATH, 'wb') as f:
-        pickle.dump(package, f)
+    joblib.dump(package, MODEL_PATH, compress=_MODEL_COMPRESS)
     # Also save cluster profiles as readable JSON
     with open(CLUSTER_PATH, 'w', encoding='utf-8') as f:
-        json.dump(cluster_profiles, f, indent=2)
+        json.dump(_profiles_to_json(cluster_profiles), f, indent=2)
 
     return {**package}
 
 
 def _load_model():
-    if os.path.exists(MODEL_PATH):
-        with open(MODEL_PATH, 'rb') as f:
-            return pickle.load(f)
-    return None
+    """Load the model package, reusing the in-memory copy until the file changes."""
+    if not os.path.exists(MODEL_PATH):
+        return None
+    key = (MODEL_PATH, os.path.getmtime(MODEL_PATH))
+    if key not in _MODEL_CACHE:
+        import joblib
+        pkg = joblib.load(MODEL_PATH)     # also reads legacy plain-pickle files
+        _MODEL_CACHE.clear()
+        _MODEL_CACHE[key] = pkg
+    return _MODEL_CACHE[key]
 
 
 # ── Estimation ────────────────────────────────────────────────────────────────
@@ -259,6 +344,78 @@ def _prior_estimate(building_type, floors, floor_area_m2):
     }
 
 
+_COUNT_COLS  = ['n_columns', 'n_slabs', 'n_beams', 'n_clusters']
+_COUNT_IDX   = [TARGET_COLS.index(c) for c in _COUNT_COLS]
+_NO_MODEL_SRC = 'prior (no model yet — upload real CSVs to library)'
+
+
+def _usable_model():
+    """The trained model package, or None when there is no model worth using yet."""
+    pkg = _load_model() if SKLEARN_OK else None
+    if pkg is None or pkg.get('n_samples', 0) < 2:
+        return None
+    return pkg
+
+
+def _fallback_estimate(building_type, floors, floor_area_m2):
+    """_prior_estimate, with source noting the missing model when sklearn is available."""
+    result = _prior_estimate(building_type, floors, floor_area_m2)
+    if SKLEARN_OK:
+        result['source'] = _NO_MODEL_SRC
+    return result
+
+
+def _ml_source(pkg: dict) -> str:
+    return f"ML model ({pkg['n_samples']} training projects)"
+
+
+def _finish_predictions(Y_pred: np.ndarray) -> np.ndarray:
+    """
+    Raw model output (rows × targets) → rows × TARGET_COLS: negatives clipped
+    to 0, counts rounded to whole numbers ≥ 1, n_clusters derived from the
+    counts when it wasn't predicted.
+    """
+    # Handle old models trained on fewer targets than current TARGET_COLS:
+    # targets the model doesn't know stay 0
+    Y = np.zeros((len(Y_pred), len(TARGET_COLS)))
+    n_known = min(Y_pred.shape[1], len(TARGET_COLS))
+    Y[:, :n_known] = np.maximum(Y_pred[:, :n_known], 0)
+
+    n_col, n_slab, n_beam, n_clus = np.maximum(1, np.round(Y[:, _COUNT_IDX])).T
+    Y[:, _COUNT_IDX[:3]] = np.column_stack([n_col, n_slab, n_beam])
+    Y[:, _COUNT_IDX[3]]  = np.where(n_clus > 1, n_clus, n_col // 2 + n_slab + n_beam // 2)
+    return Y
+
+
+def _predict_batch(pkg: dict, df_in: pd.DataFrame) -> pd.DataFrame:
+    """Run the trained model on every row of df_in with a single predict call."""
+    X, _ = _encode_features(df_in, _bt_index(pkg))
+    out = pd.DataFrame(_finish_predictions(pkg['model'].predict(X)),
+                       columns=TARGET_COLS, index=df_in.index)
+    out[_COUNT_COLS] = out[_COUNT_COLS].astype(int)
+    out['source'] = _ml_source(pkg)
+    return out
+
+
+def estimate_batch(df_in: pd.DataFrame) -> pd.DataFrame:
+    """
+    Predict element counts + dimensions for many projects at once.
+
+    df_in needs building_type, floors, floor_area_m2 and duration_days columns.
+    Returns one row per input row with TARGET_COLS + source; the model is
+    evaluated with one predict() call over the stacked inputs.
+    Falls back to construction norms if not enough training data.
+    """
+    pkg = _usable_model()
+    if pkg is None:
+        return pd.DataFrame(
+            [_fallback_estimate(bt, fl, area) for bt, fl, area in
+             zip(df_in['building_type'], df_in['floors'], df_in['floor_area_m2'])],
+            index=df_in.index,
+        ).drop(columns='cluster_profiles')
+    return _predict_batch(pkg, df_in)
+
+
 def estimate(
     building_type: str,
     floors: int,
@@ -269,36 +426,16 @@ def estimate(
     Predict element counts + dimensions for a new project.
     Falls back to construction norms if not enough training data.
     """
-    if not SKLEARN_OK:
-        return _prior_estimate(building_type, floors, floor_area_m2)
-
-    pkg = _load_model()
-    if pkg is None or pkg.get('n_samples', 0) < 2:
-        result = _prior_estimate(building_type, floors, floor_area_m2)
-        result['source'] = 'prior (no model yet — upload real CSVs to library)'
-        return result
-
-    X_new = np.array([[0, floors, floor_area_m2, duration_days]], dtype=float)
-    known = set(pkg['le'].classes_)
-    bt = building_type if building_type in known else pkg['le'].classes_[0]
-    X_new[0, 0] = pkg['le'].transform([bt])[0]
-
-    Y_pred = pkg['model'].predict(X_new)[0]
-    # Handle old models trained on fewer targets than current TARGET_COLS
-    result = {}
-    for i, col in enumerate(TARGET_COLS):
-        if i < len(Y_pred):
-            result[col] = max(0, float(Y_pred[i]))
-        else:
-            # Fallback for new targets not in old model
-            result[col] = 0
-    # Round counts to integers
-    for k in ('n_columns', 'n_slabs', 'n_beams', 'n_clusters'):
-        result[k] = max(1, round(result.get(k, 1)))
-    # If n_clusters wasn't predicted, derive from counts
-    if result['n_clusters'] <= 1:
-        result['n_clusters'] = result['n_columns'] // 2 + result['n_slabs'] + result['n_beams'] // 2
-    result['source'] = f"ML model ({pkg['n_samples']} training projects)"
+    pkg = _usable_model()
+    if pkg is None:
+        return _fallback_estimate(building_type, floors, floor_area_m2)
+
+    # Unknown building types fall back to the first known class (code 0)
+    code  = _bt_index(pkg).get(str(building_type), 0)
+    X_new = np.array([[code, floors, floor_area_m2, duration_days]], dtype=float)
+    row   = _finish_predictions(pkg['model'].predict(X_new))[0].tolist()
+    result = {col: (int(v) if col in _COUNT_COLS else v) for col, v in zip(TARGET_COLS, row)}
+    result['source'] = _ml_source(pkg)
     result['cluster_profiles'] = pkg.get('cluster_profiles')
     return result
 
@@ -325,79 +462,67 @@ def generate_elements_from_estimate(
     if zone_names is None:
         zone_names = ['Zone-A']
 
-    start = datetime.strptime(start_date, '%Y-%m-%d')
+    start = np.datetime64(datetime.strptime(start_date, '%Y-%m-%d').date(), 'D')
     total_elements = est['n_columns'] + est['n_slabs'] + est['n_beams']
-    date_range = [start + timedelta(days=int(i * duration_days / max(total_elements - 1, 1)))
-                  for i in range(total_elements)]
 
     profiles = est.get('cluster_profiles') or {}
 
-    rows = []
-    idx  = 0
-    n_zones = len(zone_names)
-
-    def _distribute_across_profiles(etype, count, dim_key_prefix, fallback_L, fallback_W, fallback_H):
+    def _distribute_across_profiles(etype, count, fallback_L, fallback_W, fallback_H):
         """
         If cluster profiles exist for etype, distribute `count` elements across
         the known dimension clusters proportionally.  Otherwise, single dimension.
+        Returns (dims, n): an (k, 3) array of L/W/H and the element count per row.
         """
-        nonlocal idx
-        type_profiles = profiles.get(etype, [])
-
-        if type_profiles:
-            # Distribute proportionally to historical counts
-            total_hist = sum(p['count'] for p in type_profiles)
-            allocated = []
-            remaining = count
-            for i, p in enumerate(type_profiles):
-                if i == len(type_profiles) - 1:
-                    n = remaining          # last cluster gets remainder
-                else:
-                    n = max(1, round(count * p['count'] / total_hist))
-                    n = min(n, remaining)
-                if n > 0:
-                    allocated.append((p['L'], p['W'], p['H'], n))
-                    remaining -= n
-                if remaining <= 0:
-                    break
-            # If there are leftover (profiles too few), put remainder on first profile
-            if remaining > 0 and allocated:
-                l, w, h, c = allocated[0]
-                allocated[0] = (l, w, h, c + remaining)
-        else:
-            # Fallback: single dimension
-            allocated = [(fallback_L, fallback_W, fallback_H, count)]
-
-        for L, W, H, n in allocated:
-            for i in range(n):
-                floor = (idx % floors) + 1
-                zone  = zone_names[idx % n_zones]
-                area  = _formwork_area(etype, L, W, H)
-                cost  = round(area * formwork_rate_per_m2, 0)
-                rows.append({
-                    'Element_ID':              f"EST-{idx+1:04d}",
-                    'Type':                    etype,
-                    'Length':                  round(L, 3),
-                    'Width':                   round(W, 3),
-                    'Height':                  round(H, 3),
-                    'Floor':                   floor,
-                    'Zone':                    zone,
-                    'Casting_Date':            date_range[min(idx, len(date_range)-1)].strftime('%Y-%m-%d'),
-                    'Formwork_Area_m2':        round(area, 2),
-                    'Formwork_Cost_per_Set':   cost,
-                    'Replacement_Cost_per_Set': round(cost * 0.85, 0),
-                    'Max_Reuse_Count':         10,
-                })
-                idx += 1
-
-    _distribute_across_profiles(
-        'Column', est['n_columns'],
-        'col', est['col_length'], est['col_width'], est['col_height'])
-    _distribute_across_profiles(
-        'Slab', est['n_slabs'],
-        'slab', est['slab_length'], est['slab_width'], est['slab_height'])
-    _distribute_across_profiles(
-        'Beam', est['n_beams'],
-        'beam', est['beam_length'], est['beam_width'], est['beam_height'])
-
-    return pd.DataFrame(rows)
+        arr = _profile_array(profiles.get(etype))
+
+        if len(arr):
+            # Distribute proportionally to historical counts; each cluster takes
+            # at least one element until `count` runs out, the last takes the rest
+            share = np.maximum(1, np.round(count * arr['count'] / arr['count'].sum()))
+            share = share.astype(np.int64)
+            share[-1] = count
+            n = np.diff(np.minimum(np.cumsum(share), count), prepend=0)
+            keep = n > 0
+            # Profiles hold 3-decimal sizes; round away the float32 storage error
+            dims = np.column_stack([arr['L'], arr['W'], arr['H']]).astype(np.float64).round(3)
+            return dims[keep], n[keep]
+        # Fallback: single dimension
+        return np.array([[fallback_L, fallback_W, fallback_H]], dtype=np.float64), np.array([count])
+
+    allocated = [
+        ('Column', _distribute_across_profiles('Column', est['n_columns'],
+                                               est['col_length'], est['col_width'], est['col_height'])),
+        ('Slab',   _distribute_across_profiles('Slab', est['n_slabs'],
+                                               est['slab_length'], est['slab_width'], est['slab_height'])),
+        ('Beam',   _distribute_across_profiles('Beam', est['n_beams'],
+                                               est['beam_length'], est['beam_width'], est['beam_height'])),
+    ]
+
+    # Expand each (type, L, W, H, n) allocation into n rows, one column at a time
+    g_type = np.concatenate([np.full(len(n), etype, dtype=object) for etype, (_, n) in allocated])
+    g_dims = np.concatenate([dims for _, (dims, _) in allocated])
+    counts = np.concatenate([n for _, (_, n) in allocated]).astype(np.int64)
+    total  = int(counts.sum())
+    idx    = np.arange(total)
+
+    area = np.repeat(_formwork_area_vec(g_type, g_dims[:, 0], g_dims[:, 1], g_dims[:, 2]), counts)
+    cost = np.round(area * formwork_rate_per_m2, 0)
+
+    # Spread pours evenly over the duration: integer day offsets on datetime64
+    offsets = (idx * duration_days // max(total_elements - 1, 1)).astype('timedelta64[D]')
+    dates   = np.datetime_as_string(start + offsets, unit='D')
+
+    return pd.DataFrame({
+        'Element_ID':              np.char.add('EST-', np.char.zfill((idx + 1).astype(str), 4)),
+        'Type':                    np.repeat(g_type, counts),
+        'Length':                  np.repeat(g_dims[:, 0].round(3), counts),
+        'Width':                   np.repeat(g_dims[:, 1].round(3), counts),
+        'Height':                  np.repeat(g_dims[:, 2].round(3), counts),
+        'Floor':                   idx % floors + 1,
+        'Zone':                    np.asarray(zone_names, dtype=object)[idx % len(zone_names)],
+        'Casting_Date':            dates,
+        'Formwork_Area_m2':        np.round(area, 2),
+        'Formwork_Cost_per_Set':   cost,
+        'Replacement_Cost_per_Set': np.round(cost * 0.85, 0),
+        'Max_Reuse_Count':         10,
+    })
@@ -1,53 +1,57 @@
 import pandas as pd
 import numpy as np
-import random
-from datetime import datetime, timedelta
+from datetime import date
 import os
 
-def create_mock_data(output_dir="."):
-    np.random.seed(42)
-    random.seed(42)
+# Candidate (L, W, H) sizes and formwork cost per set, indexed like `types`
+_DIMS = {
+    'Column': [(0.5, 0.5, 3.0), (0.6, 0.6, 3.0), (0.4, 0.4, 3.0), (0.8, 0.8, 3.5)],
+    'Slab':   [(5.0, 5.0, 0.2), (4.0, 4.0, 0.2), (6.0, 6.0, 0.2), (8.0, 5.0, 0.25)],
+    'Beam':   [(5.0, 0.3, 0.5), (4.0, 0.3, 0.5), (6.0, 0.4, 0.6), (7.0, 0.5, 0.7)],
+}
+_COSTS = {'Column': 1200, 'Slab': 3500, 'Beam': 1800}
 
-    types  = ['Column', 'Slab', 'Beam']
-    zones  = ['Zone-A', 'Zone-B', 'Zone-C']
-    start  = datetime.today().replace(hour=0, minute=0, second=0, microsecond=0)
 
-    elements = []
+def create_mock_data(output_dir=".", include_zone=True):
+    """
+    Write a synthetic structural_elements.csv + schedule.csv to output_dir.
+    include_zone=False drops the Zone and Replacement_Cost_per_Set columns
+    (the original single-zone layout).
+    """
+    rng = np.random.default_rng(42)
+    n   = 400
 
-    for i in range(1, 401):
-        t = random.choice(types)
-        if t == 'Column':
-            l, w, h = random.choice([(0.5, 0.5, 3.0), (0.6, 0.6, 3.0), (0.4, 0.4, 3.0), (0.8, 0.8, 3.5)])
-            cost = 1200
-        elif t == 'Slab':
-            l, w, h = random.choice([(5.0, 5.0, 0.2), (4.0, 4.0, 0.2), (6.0, 6.0, 0.2), (8.0, 5.0, 0.25)])
-            cost = 3500
-        else:
-            l, w, h = random.choice([(5.0, 0.3, 0.5), (4.0, 0.3, 0.5), (6.0, 0.4, 0.6), (7.0, 0.5, 0.7)])
-            cost = 1800
+    types  = ['Column', 'Slab', 'Beam']
+    zones  = ['Zone-A', 'Zone-B', 'Zone-C']
+    start  = np.datetime64(date.today(), 'D')
 
-        floor     = random.randint(1, 15)
-        cast_date = start + timedelta(days=random.randint(0, 45))
-        zone      = random.choice(zones)
+    # Draw every row at once: type, size option, floor, casting day, zone
+    dims  = np.array([_DIMS[t] for t in types])            # (type, option, L/W/H)
+    costs = np.array([_COSTS[t] for t in types])
+    type_idx  = rng.integers(0, len(types), size=n)
+    lwh       = dims[type_idx, rng.integers(0, dims.shape[1], size=n)]
+    cost      = costs[type_idx]
+    cast_date = start + rng.integers(0, 46, size=n).astype('timedelta64[D]')
 
-        elements.append({
-            'Element_ID':             f"E-{i:03d}",
-            'Type':                   t,
-            'Length':                 l,
-            'Width':                  w,
-            'Height':                 h,
-            'Floor':                  floor,
-            'Zone':                   zone,                   # Feature 2
-            'Casting_Date':           cast_date.strftime('%Y-%m-%d'),
-            'Formwork_Cost_per_Set':  cost,
-            'Replacement_Cost_per_Set': round(cost * 0.85, 0),  # Feature 1: replacement usually cheaper
-            'Max_Reuse_Count':        10,                     # Feature 1 hint column (informational)
-        })
+    df = pd.DataFrame({
+        'Element_ID':             [f"E-{i:03d}" for i in range(1, n + 1)],
+        'Type':                   np.array(types, dtype=object)[type_idx],
+        'Length':                 lwh[:, 0],
+        'Width':                  lwh[:, 1],
+        'Height':                 lwh[:, 2],
+        'Floor':                  rng.integers(1, 16, size=n),
+        'Zone':                   np.array(zones, dtype=object)[rng.integers(0, len(zones), size=n)],  # Feature 2
+        'Casting_Date':           np.datetime_as_string(cast_date, unit='D'),
+        'Formwork_Cost_per_Set':  cost,
+        'Replacement_Cost_per_Set': np.round(cost * 0.85, 0),  # Feature 1: replacement usually cheaper
+        'Max_Reuse_Count':        10,                     # Feature 1 hint column (informational)
+    })
 
-    df = pd.DataFrame(elements)
+    if not include_zone:
+        df = df.drop(columns=['Zone', 'Replacement_Cost_per_Set'])
 
     # Add 100 duplicated high-repeat rows to simulate real clustering density
-    highfreq = df.sample(100, replace=True)
+    highfreq = df.sample(100, replace=True, random_state=rng)
     df = pd.concat([df, highfreq], ignore_index=True)
     df['Element_ID'] = [f"E-{i:03d}" for i in range(1, len(df) + 1)]
 
@@ -55,15 +59,16 @@ def create_mock_data(output_dir="."):
 
     # schedule.csv
     sched = (
-        df.groupby('Casting_Date')['Element_ID']
-          .apply(lambda x: ', '.join(x))
+        df.sort_values('Casting_Date', kind='stable')
+          .groupby('Casting_Date', sort=False)['Element_ID']
+          .agg(', '.join)
           .reset_index()
           .rename(columns={'Element_ID': 'Elements_Planned', 'Casting_Date': 'Date'})
     )
     sched.to_csv(os.path.join(output_dir, 'schedule.csv'), index=False)
 
     print(f"Mock data written to: {output_dir}")
-    print(f"  structural_elements.csv — {len(df)} rows, zones: {zones}")
+    print(f"  structural_elements.csv — {len(df)} rows, zones: {zones if include_zone else 'none'}")
 
 if __name__ == "__main__":
     create_mock_data()
@@ -1,5 +1,5 @@
 import pandas as pd
-import matplotlib.pyplot as plt
+from matplotlib.figure import Figure
 
 def simulate_timeline(df_elements, df_optimization, reuse_cycle_days=7):
     """
@@ -12,13 +12,13 @@ def simulate_timeline(df_elements, df_optimization, reuse_cycle_days=7):
     max_date = df['Casting_Date'].max() + pd.Timedelta(days=reuse_cycle_days)
     all_dates = pd.date_range(min_date, max_date)
     
-    opt_dict = df_optimization.set_index('Cluster_ID')['Required_Sets'].to_dict()
+    # Inventory on hand is constant over the timeline — compute it once
+    total_avail = int(df_optimization['Required_Sets'].sum())
     
     timeline = []
     
     for d in all_dates:
         daily_req = 0
-        daily_avail = sum(opt_dict.values())
         
         # Elements active today (poured between d-reuse_cycle+1 and d)
         active_mask = (df['Casting_Date'] > d - pd.Timedelta(days=reuse_cycle_days)) & (df['Casting_Date'] <= d)
@@ -33,7 +33,7 @@ def simulate_timeline(df_elements, df_optimization, reuse_cycle_days=7):
         timeline.append({
             'Date': d,
             'Required Sets (Active)': daily_req,
-            'Available Sets (Inventory)': daily_avail,
+            'Available Sets (Inventory)': total_avail,
             'Reused Sets': daily_reused
         })
         
@@ -41,7 +41,9 @@ def simulate_timeline(df_elements, df_optimization, reuse_cycle_days=7):
     return df_timeline
 
 def plot_inventory_timeline(df_timeline):
-    fig, ax = plt.subplots(figsize=(12, 5))
+    # Standalone Figure: not registered with pyplot, so nothing leaks between calls
+    fig = Figure(figsize=(12, 5))
+    ax = fig.subplots()
     
     ax.plot(df_timeline['Date'], df_timeline['Available Sets (Inventory)'], label='Available Sets (Optimized Inventory)', color='#118DFF', linewidth=2, linestyle='--')
     ax.plot(df_timeline['Date'], df_timeline['Required Sets (Active)'], label='Required Sets (In Use)', color='#0E2A47', linewidth=2)
@@ -51,7 +53,7 @@ def plot_inventory_timeline(df_timeline):
     ax.set_xlabel('Project Date', fontsize=12)
     ax.set_ylabel('Number of Formwork Sets', fontsize=12)
     ax.legend()
-    plt.xticks(rotation=45)
-    plt.tight_layout()
+    ax.tick_params(axis='x', labelrotation=45)
+    fig.tight_layout()
     
     return fig
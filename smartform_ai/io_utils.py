@@ -0,0 +1,158 @@
+"""
+io_utils.py
+Small file-output and column helpers shared across SmartForm AI modules.
+"""
+import zipfile
+from xml.sax.saxutils import escape, quoteattr
+
+import numpy as np
+import pandas as pd
+
+
+def as_datetime(values):
+    """pd.to_datetime, skipped when the column already has a datetime dtype."""
+    return values if pd.api.types.is_datetime64_any_dtype(values) else pd.to_datetime(values)
+
+
+# ── Minimal SpreadsheetML writer ───────────────────────────────────────────────
+_XLSX_EPOCH = pd.Timestamp('1899-12-30')
+
+_XLSX_CONTENT_TYPES = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+    '<Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">'
+    '<Default Extension="rels" ContentType="application/vnd.openxmlformats-package.relationships+xml"/>'
+    '<Default Extension="xml" ContentType="application/xml"/>'
+    '<Override PartName="/xl/workbook.xml" '
+    'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet.main+xml"/>'
+    '<Override PartName="/xl/styles.xml" '
+    'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.styles+xml"/>'
+    '{sheets}</Types>'
+)
+_XLSX_ROOT_RELS = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+    '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+    '<Relationship Id="rId1" '
+    'Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/officeDocument" '
+    'Target="xl/workbook.xml"/></Relationships>'
+)
+# Style 0 = default, style 1 = date-time (used for datetime cells)
+_XLSX_STYLES = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+    '<styleSheet xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main">'
+    '<numFmts count="1"><numFmt numFmtId="164" formatCode="yyyy-mm-dd hh:mm:ss"/></numFmts>'
+    '<fonts count="1"><font><sz val="11"/><name val="Calibri"/></font></fonts>'
+    '<fills count="2"><fill><patternFill patternType="none"/></fill>'
+    '<fill><patternFill patternType="gray125"/></fill></fills>'
+    '<borders count="1"><border><left/><right/><top/><bottom/><diagonal/></border></borders>'
+    '<cellStyleXfs count="1"><xf numFmtId="0" fontId="0" fillId="0" borderId="0"/></cellStyleXfs>'
+    '<cellXfs count="2"><xf numFmtId="0" fontId="0" fillId="0" borderId="0" xfId="0"/>'
+    '<xf numFmtId="164" fontId="0" fillId="0" borderId="0" xfId="0" applyNumberFormat="1"/></cellXfs>'
+    '<cellStyles count="1"><cellStyle name="Normal" xfId="0" builtinId="0"/></cellStyles>'
+    '</styleSheet>'
+)
+
+
+def _xlsx_col_letter(idx: int) -> str:
+    letters = ''
+    idx += 1
+    while idx:
+        idx, rem = divmod(idx - 1, 26)
+        letters = chr(65 + rem) + letters
+    return letters
+
+
+def _xlsx_str_cell(ref: str, value) -> str:
+    return f'<c r="{ref}" t="inlineStr"><is><t xml:space="preserve">{escape(str(value))}</t></is></c>'
+
+
+def _xlsx_cell(ref: str, value) -> str:
+    """One <c> element for an arbitrary Python/NumPy scalar; nulls are omitted."""
+    if value is None or (not isinstance(value, str) and pd.isna(value)):
+        return ''
+    if isinstance(value, (bool, np.bool_)):
+        return f'<c r="{ref}" t="b"><v>{int(value)}</v></c>'
+    if isinstance(value, (int, np.integer)):
+        return f'<c r="{ref}"><v>{int(value)}</v></c>'
+    if isinstance(value, (float, np.floating)):
+        if not np.isfinite(value):
+            return _xlsx_str_cell(ref, value)
+        return f'<c r="{ref}"><v>{float(value)!r}</v></c>'
+    if isinstance(value, (pd.Timestamp, np.datetime64)) or hasattr(value, 'isoformat'):
+        try:
+            serial = (pd.Timestamp(value) - _XLSX_EPOCH) / pd.Timedelta(days=1)
+            return f'<c r="{ref}" s="1"><v>{serial!r}</v></c>'
+        except (TypeError, ValueError):
+            pass
+    return _xlsx_str_cell(ref, value)
+
+
+def _xlsx_column_cells(letter: str, col: pd.Series) -> list:
+    """Cell XML for every data row of one column (rows start at 2)."""
+    refs = [f'{letter}{r}' for r in range(2, len(col) + 2)]
+    if pd.api.types.is_datetime64_any_dtype(col):
+        if getattr(col.dt, 'tz', None) is not None:
+            col = col.dt.tz_localize(None)
+        serial = ((col - _XLSX_EPOCH) / pd.Timedelta(days=1)).to_numpy()
+        return [f'<c r="{ref}" s="1"><v>{v!r}</v></c>' if v == v else ''
+                for ref, v in zip(refs, serial.tolist())]
+    # Plain NumPy ints / finite floats: format the whole column directly
+    kind = col.dtype.kind if isinstance(col.dtype, np.dtype) else 'O'
+    if kind in 'iu' or (kind == 'f' and np.isfinite(col.to_numpy()).all()):
+        return [f'<c r="{ref}"><v>{v!r}</v></c>' for ref, v in zip(refs, col.to_numpy().tolist())]
+    return [_xlsx_cell(ref, v) for ref, v in zip(refs, col.tolist())]
+
+
+def xlsx_sheet_xml(df: pd.DataFrame) -> bytes:
+    """Worksheet XML for df (header row + data rows), as used by write_xlsx."""
+    letters = [_xlsx_col_letter(i) for i in range(len(df.columns))]
+    header  = ''.join(_xlsx_str_cell(f'{l}1', c) for l, c in zip(letters, df.columns))
+    columns = [_xlsx_column_cells(l, df.iloc[:, i]) for i, l in enumerate(letters)]
+    rows    = [f'<row r="1">{header}</row>']
+    rows   += [f'<row r="{r}">{"".join(cells)}</row>'
+               for r, cells in enumerate(zip(*columns), 2)]
+    return (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+        '<worksheet xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main">'
+        f'<sheetData>{"".join(rows)}</sheetData></worksheet>'
+    ).encode('utf-8')
+
+
+def write_xlsx(sheets: dict, path):
+    """
+    Write {sheet_name: DataFrame} to path (a filename or binary file object)
+    as an .xlsx workbook, generating the sheet XML directly.  A sheet may
+    also be given as pre-rendered xlsx_sheet_xml() bytes.
+
+    No per-cell objects or style lookups: cells are plain values, datetimes
+    share one date format, and there is no other formatting.  Use this for
+    large sheets where xlsxwriter/openpyxl cell handling dominates.
+    """
+    names = list(sheets)
+    with zipfile.ZipFile(path, 'w', zipfile.ZIP_DEFLATED) as zf:
+        zf.writestr('[Content_Types].xml', _XLSX_CONTENT_TYPES.format(sheets=''.join(
+            f'<Override PartName="/xl/worksheets/sheet{i}.xml" '
+            'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.worksheet+xml"/>'
+            for i in range(1, len(names) + 1))))
+        zf.writestr('_rels/.rels', _XLSX_ROOT_RELS)
+        zf.writestr('xl/workbook.xml', (
+            '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+            '<workbook xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main" '
+            'xmlns:r="http://schemas.openxmlformats.org/officeDocument/2006/relationships"><sheets>'
+            + ''.join(f'<sheet name={quoteattr(n[:31])} sheetId="{i}" r:id="rId{i}"/>'
+                      for i, n in enumerate(names, 1))
+            + '</sheets></workbook>'))
+        zf.writestr('xl/_rels/workbook.xml.rels', (
+            '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+            '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+            + ''.join(f'<Relationship Id="rId{i}" '
+                      'Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/worksheet" '
+                      f'Target="worksheets/sheet{i}.xml"/>' for i in range(1, len(names) + 1))
+            + f'<Relationship Id="rId{len(names) + 1}" '
+            'Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/styles" '
+            'Target="styles.xml"/></Relationships>'))
+        zf.writestr('xl/styles.xml', _XLSX_STYLES)
+        for i, name in enumerate(names, 1):
+            sheet = sheets[name]
+            if isinstance(sheet, pd.DataFrame):
+                sheet = xlsx_sheet_xml(sheet)
+            zf.writestr(f'xl/worksheets/sheet{i}.xml', sheet)
@@ -13,10 +13,72 @@ Output:
   - kit_summary DataFrame: per Kit_ID stats
   - Standardization Score: 0–100 reflecting design repetition quality
 """
+import io
+from functools import lru_cache
 import pandas as pd
 import numpy as np
 from datetime import timedelta
 
+from io_utils import as_datetime, write_xlsx, xlsx_sheet_xml
+
+try:
+    from numba import njit
+except ImportError:
+    def njit(*args, **kwargs):
+        """No-op stand-in: run the decorated function as plain Python."""
+        return lambda fn: fn
+
+try:
+    import xlsxwriter
+    XLSXWRITER_OK = True
+except ImportError:
+    XLSXWRITER_OK = False
+
+# Streaming workbook options: rows are flushed to disk as they are written
+_XLSX_OPTIONS = {
+    'constant_memory': True,
+    'default_date_format': 'yyyy-mm-dd hh:mm:ss',
+}
+
+
+@njit(cache=True)
+def _assign_kits_greedy(dates, reuse_cycle_days):
+    """
+    Greedy kit assignment for one cluster.
+
+    dates must be sorted ascending integer day numbers.  Each pour takes the
+    lowest-numbered kit idle for ≥ reuse_cycle_days, else a new kit.
+    Returns (kit_no, reuse_count, days_since) arrays aligned with dates.
+    """
+    n = len(dates)
+    last_used   = np.full(n, -10**18, np.int64)   # at most one kit per pour
+    kit_uses    = np.zeros(n, np.int64)
+    kit_no      = np.empty(n, np.int64)
+    reuse_count = np.empty(n, np.int64)
+    days_since  = np.empty(n, np.int64)
+    n_kits = 0
+
+    for i in range(n):
+        cast = dates[i]
+        k    = n_kits
+        gap  = 0
+        for j in range(n_kits):
+            if cast - last_used[j] >= reuse_cycle_days:
+                k   = j
+                gap = cast - last_used[j]
+                break
+        if k == n_kits:
+            # All existing kits still curing — create a new one
+            n_kits += 1
+
+        last_used[k] = cast
+        kit_uses[k] += 1
+        kit_no[i]      = k + 1
+        reuse_count[i] = kit_uses[k]
+        days_since[i]  = gap
+
+    return kit_no, reuse_count, days_since
+
 
 def assign_kits(df_elements: pd.DataFrame, reuse_cycle_days: int = 7) -> pd.DataFrame:
     """
@@ -40,81 +102,88 @@ def assign_kits(df_elements: pd.DataFrame, reuse_cycle_days: int = 7) -> pd.Data
         Reuse_Count   – how many times this kit has been used up to this pour
         Days_Since_Prev – days since last use of this kit (0 for first use)
     """
-    df = df_elements.copy()
-    df['Casting_Date'] = pd.to_datetime(df['Casting_Date'])
-    df = df.sort_values(['Cluster_ID', 'Casting_Date']).reset_index(drop=True)
-
-    kit_id_col      = []
-    kit_no_col      = []
-    reuse_count_col = []
-    days_since_col  = []
-
-    for cluster, grp in df.groupby('Cluster_ID', sort=False):
-        # Kit tracker: kit_no → last_used_date
-        kit_last_used: dict = {}   # kit_no (int) → last Casting_Date (pd.Timestamp)
-        kit_reuse_count: dict = {} # kit_no → int
-
-        assignments = {}  # row index → (kit_no, reuse_count, days_since)
-
-        for idx, row in grp.iterrows():
-            cast = row['Casting_Date']
-            assigned = None
-
-            # Try to find an available kit (cured for ≥ reuse_cycle_days)
-            for kit_no, last_used in sorted(kit_last_used.items()):
-                gap = (cast - last_used).days
-                if gap >= reuse_cycle_days:
-                    assigned   = kit_no
-                    days_since = gap
-                    break
-
-            if assigned is None:
-                # All existing kits still curing — create a new one
-                assigned   = len(kit_last_used) + 1
-                days_since = 0
-
-            kit_last_used[assigned] = cast
-            kit_reuse_count[assigned] = kit_reuse_count.get(assigned, 0) + 1
-            assignments[idx] = (assigned, kit_reuse_count[assigned], days_since)
-
-        for idx, (kit_no, reuse_cnt, days) in assignments.items():
-            # Build human-readable kit ID
-            row = df.loc[idx]
-            size = f"{row['Length']}x{row['Width']}" if 'Length' in df.columns else ''
-            kid  = f"{cluster}_Kit-{kit_no:02d}"
-            kit_id_col.append(kid)
-            kit_no_col.append(kit_no)
-            reuse_count_col.append(reuse_cnt)
-            days_since_col.append(days)
-
-    df['Kit_ID']         = kit_id_col
+    df = df_elements.assign(Casting_Date=as_datetime(df_elements['Casting_Date']))
+    # Repeated string keys → integer-coded categoricals for sorting/grouping
+    for col in ('Cluster_ID', 'Type', 'Zone'):
+        if col in df.columns:
+            df[col] = df[col].astype('category')
+
+    # One stable sort into the output order; each cluster's rows are then
+    # already in date order, so groupby indices feed the greedy pass directly
+    df = df.sort_values(['Casting_Date', 'Cluster_ID'], kind='mergesort').reset_index(drop=True)
+
+    # Casting dates as integer day numbers; outputs are filled by row position
+    day_arr         = df['Casting_Date'].values.astype('datetime64[D]').view(np.int64)
+    kit_no_col      = np.zeros(len(df), dtype=np.int64)
+    reuse_count_col = np.zeros(len(df), dtype=np.int64)
+    days_since_col  = np.zeros(len(df), dtype=np.int64)
+
+    for idx_array in df.groupby('Cluster_ID', sort=False, observed=True).indices.values():
+        (kit_no_col[idx_array], reuse_count_col[idx_array],
+         days_since_col[idx_array]) = _assign_kits_greedy(day_arr[idx_array], reuse_cycle_days)
+
+    # Build human-readable kit IDs: format each cluster name and kit suffix
+    # once, then concatenate by integer code (code -1 = missing → 'nan')
+    cluster_names = np.append(df['Cluster_ID'].cat.categories.astype(str), 'nan')
+    kit_suffixes  = np.array([f"_Kit-{n:02d}" for n in range(int(kit_no_col.max(initial=0)) + 1)])
+    df['Kit_ID']         = np.char.add(cluster_names[df['Cluster_ID'].cat.codes.to_numpy()],
+                                       kit_suffixes[kit_no_col]).astype(object)
     df['Kit_Number']     = kit_no_col
     df['Reuse_Count']    = reuse_count_col
     df['Days_Since_Prev']= days_since_col
 
-    return df.sort_values(['Casting_Date', 'Cluster_ID']).reset_index(drop=True)
+    return df
 
 
 def kit_summary(df_kitted: pd.DataFrame) -> pd.DataFrame:
     """
     Aggregate to one row per Kit_ID with utilisation stats.
     """
-    grp = df_kitted.groupby('Kit_ID').agg(
+    # Carry the integer kit number through so the final ordering can sort on
+    # it instead of the long Kit_ID strings
+    kit_no = {'_kit_no': ('Kit_Number', 'first')} if 'Kit_Number' in df_kitted.columns else {}
+    grp = df_kitted.groupby('Kit_ID', sort=False, observed=True).agg(
         Cluster_ID    = ('Cluster_ID', 'first'),
         Type          = ('Type', 'first'),
-        Total_Uses    = ('Kit_ID', 'count'),
+        Total_Uses    = ('Kit_ID', 'size'),
         First_Use     = ('Casting_Date', 'min'),
         Last_Use      = ('Casting_Date', 'max'),
-        Elements      = ('Element_ID', lambda x: ', '.join(x.astype(str))),
-    ).reset_index()
+        **kit_no,
+    )
+    # Stringify IDs once, then join per kit without a per-group lambda
+    grp['Elements'] = (
+        df_kitted['Element_ID'].astype(str)
+                 .groupby(df_kitted['Kit_ID'], sort=False, observed=True)
+                 .agg(', '.join)
+    )
+    grp = grp.reset_index()
 
     grp['Active_Days'] = (
-        pd.to_datetime(grp['Last_Use']) - pd.to_datetime(grp['First_Use'])
+        as_datetime(grp['Last_Use']) - as_datetime(grp['First_Use'])
     ).dt.days + 1
 
     grp['Reuse_Efficiency_%'] = ((grp['Total_Uses'] - 1) / grp['Total_Uses'] * 100).round(1)
 
-    return grp.sort_values(['Cluster_ID', 'Kit_ID']).reset_index(drop=True)
+    grp['Cluster_ID'] = grp['Cluster_ID'].astype('category')
+    grp = grp.sort_values(['Cluster_ID', '_kit_no' if kit_no else 'Kit_ID'], kind='mergesort')
+    return grp.drop(columns=list(kit_no)).reset_index(drop=True)
+
+
+# Score thresholds (lower bounds) and the grade for each band, worst first
+_GRADE_CUTS = np.array([35, 50, 65, 80])
+_GRADES = (
+    ('F — Poor',      '#DC2626'),
+    ('D — Below Avg', '#EA580C'),
+    ('C — Average',   '#D97706'),
+    ('B — Good',      '#65A30D'),
+    ('A — Excellent', '#16A34A'),
+)
+
+
+def _n_unique(values: np.ndarray) -> int:
+    """Distinct non-null values, like Series.nunique() but on the raw array."""
+    uniq = pd.unique(values)
+    return len(uniq) - int(pd.isna(uniq).any())
 
 
 def standardization_score(df_elements: pd.DataFrame) -> dict:
@@ -133,7 +202,12 @@ def standardization_score(df_elements: pd.DataFrame) -> dict:
         return {'score': 0, 'grade': 'N/A', 'details': {}}
 
     total     = len(df_elements)
-    n_clusters = df_elements['Cluster_ID'].nunique() if 'Cluster_ID' in df_elements.columns else total
+
+    # One pass over the frame: distinct (cluster, type) combos, then count
+    # clusters and types on that small intermediate
+    key_cols = [c for c in ('Cluster_ID', 'Type') if c in df_elements.columns]
+    combos   = df_elements[key_cols].drop_duplicates() if key_cols else None
+    n_clusters = _n_unique(combos['Cluster_ID'].values) if 'Cluster_ID' in key_cols else total
 
     # Component 1: repetition ratio (0-1)
     rep_ratio  = 1 - (n_clusters / total)   # 1 = all elements identical, 0 = all unique
@@ -143,17 +217,13 @@ def standardization_score(df_elements: pd.DataFrame) -> dict:
     size_bonus = min(avg_size / 10, 1.0)    # saturates at avg cluster size 10
 
     # Component 3: type diversity penalty (having all 3 types = good structural variety)
-    n_types    = df_elements['Type'].nunique() if 'Type' in df_elements.columns else 1
+    n_types    = _n_unique(combos['Type'].values) if 'Type' in key_cols else 1
     type_bonus = min(n_types / 3, 1.0)
 
     raw_score  = (rep_ratio * 0.6 + size_bonus * 0.3 + type_bonus * 0.1) * 100
     score      = round(min(max(raw_score, 0), 100), 1)
 
-    if score >= 80:   grade, colour = 'A — Excellent',   '#16A34A'
-    elif score >= 65: grade, colour = 'B — Good',        '#65A30D'
-    elif score >= 50: grade, colour = 'C — Average',     '#D97706'
-    elif score >= 35: grade, colour = 'D — Below Avg',   '#EA580C'
-    else:             grade, colour = 'F — Poor',        '#DC2626'
+    grade, colour = _GRADES[int(np.searchsorted(_GRADE_CUTS, score, side='right'))]
 
     details = {
         'total_elements':    total,
@@ -165,6 +235,71 @@ def standardization_score(df_elements: pd.DataFrame) -> dict:
     return {'score': score, 'grade': grade, 'colour': colour, 'details': details}
 
 
+def _open_output():
+    """
+    In-memory output file for a workbook.  A 1 MiB write buffer sits in front
+    of the BytesIO so the zip writer's many small writes land as large blocks.
+    """
+    return io.BufferedWriter(io.BytesIO(), buffer_size=1 << 20)
+
+
+def _output_bytes(out) -> bytes:
+    """Flush an _open_output() file and return its contents."""
+    out.flush()
+    return out.detach().getvalue()
+
+
+def _new_workbook(buf):
+    """
+    Open a streaming workbook writing to buf: xlsxwriter in constant-memory
+    mode, else an openpyxl write-only workbook.
+    """
+    if XLSXWRITER_OK:
+        return xlsxwriter.Workbook(buf, _XLSX_OPTIONS)
+    from openpyxl import Workbook
+    return Workbook(write_only=True)
+
+
+def _close_workbook(wb, buf):
+    if XLSXWRITER_OK:
+        wb.close()
+    else:
+        wb.save(buf)
+
+
+def _stream_df(wb, name: str, df: pd.DataFrame, header_fmt=None, row_fmts=None):
+    """
+    Write df (header + rows, no index) to a new sheet, one row at a time.
+
+    header_fmt and row_fmts (one format per data row) apply to xlsxwriter
+    workbooks only.  Nulls are written as empty cells.  Returns the sheet.
+    """
+    header = [str(c) for c in df.columns]
+    rows   = df.astype(object).where(df.notna(), None).itertuples(index=False, name=None)
+
+    if XLSXWRITER_OK:
+        ws = wb.add_worksheet(name)
+        ws.write_row(0, 0, header, header_fmt)
+        for row_n, row in enumerate(rows, 1):
+            if row_fmts is not None:
+                ws.set_row(row_n, None, row_fmts[row_n - 1])
+            ws.write_row(row_n, 0, row)
+        return ws
+
+    ws = wb.create_sheet(name)
+    ws.append(header)
+    for row in rows:
+        ws.append(row)
+    return ws
+
+
+def _plain_header_fmt(wb):
+    """Header style matching DataFrame.to_excel's default (xlsxwriter only)."""
+    if not XLSXWRITER_OK:
+        return None
+    return wb.add_format({'bold': True, 'border': 1, 'align': 'center', 'valign': 'top'})
+
+
 def export_to_excel(
     df_elements: pd.DataFrame,
     df_boq: pd.DataFrame,
@@ -178,42 +313,77 @@ def export_to_excel(
     """
     Write all results to an Excel workbook and return as bytes for download.
     """
-    import io
-    try:
-        import xlsxwriter
-        engine = 'xlsxwriter'
-    except ImportError:
-        engine = 'openpyxl'
-
-    buf = io.BytesIO()
-    with pd.ExcelWriter(buf, engine=engine) as writer:
-        # Sheet 1: Summary
-        summary_data = {
-            'Metric': [
-                'Total Elements', 'Unique Clusters', 'Optimised Sets Required',
-                'Naive Sets (no reuse)', 'Procurement Cost Savings (₹)',
-                'Standardization Score', 'Standardization Grade'
-            ],
-            'Value': [
-                len(df_elements),
-                df_elements['Cluster_ID'].nunique() if 'Cluster_ID' in df_elements.columns else '-',
-                df_opt['Required_Sets'].sum() if not df_opt.empty else '-',
-                df_opt['Naive_Sets'].sum()    if not df_opt.empty else '-',
-                f"₹{df_opt['Cost_Savings'].sum():,.0f}" if not df_opt.empty else '-',
-                std_score.get('score', '-'),
-                std_score.get('grade', '-'),
-            ]
-        }
-        pd.DataFrame(summary_data).to_excel(writer, sheet_name='Summary', index=False)
-        df_elements.to_excel(writer,     sheet_name='Structural Elements', index=False)
-        if not df_boq.empty:
-            df_boq.to_excel(writer,      sheet_name='BoQ',                 index=False)
-        df_kitted.to_excel(writer,       sheet_name='Kitting Plan',        index=False)
-        df_kit_summary.to_excel(writer,  sheet_name='Kit Summary',         index=False)
-        df_opt.to_excel(writer,          sheet_name='Optimisation',        index=False)
-        df_proc.to_excel(writer,         sheet_name='Procurement Schedule', index=False)
-
-    return buf.getvalue()
+    buf = _open_output()
+    wb  = _new_workbook(buf)
+    hdr = _plain_header_fmt(wb)
+    # Sheet 1: Summary
+    summary_data = {
+        'Metric': [
+            'Total Elements', 'Unique Clusters', 'Optimised Sets Required',
+            'Naive Sets (no reuse)', 'Procurement Cost Savings (₹)',
+            'Standardization Score', 'Standardization Grade'
+        ],
+        'Value': [
+            len(df_elements),
+            df_elements['Cluster_ID'].nunique() if 'Cluster_ID' in df_elements.columns else '-',
+            df_opt['Required_Sets'].sum() if not df_opt.empty else '-',
+            df_opt['Naive_Sets'].sum()    if not df_opt.empty else '-',
+            f"₹{df_opt['Cost_Savings'].sum():,.0f}" if not df_opt.empty else '-',
+            std_score.get('score', '-'),
+            std_score.get('grade', '-'),
+        ]
+    }
+    _stream_df(wb, 'Summary',              pd.DataFrame(summary_data), hdr)
+    _stream_df(wb, 'Structural Elements',  df_elements,                hdr)
+    if not df_boq.empty:
+        _stream_df(wb, 'BoQ',              df_boq,                     hdr)
+    _stream_df(wb, 'Kitting Plan',         df_kitted,                  hdr)
+    _stream_df(wb, 'Kit Summary',          df_kit_summary,             hdr)
+    _stream_df(wb, 'Optimisation',         df_opt,                     hdr)
+    _stream_df(wb, 'Procurement Schedule', df_proc,                    hdr)
+
+    _close_workbook(wb, buf)
+    return _output_bytes(buf)
+
+
+@lru_cache(maxsize=8)
+def _readme_frame(project_name: str, reuse_cycle_days: int) -> pd.DataFrame:
+    """README sheet rows for a kitting plan; cached — treat as read-only."""
+    readme_rows = [
+        ['SmartForm AI — Formwork Kitting Plan', ''],
+        ['Project:', project_name],
+        ['Reuse Cycle:', f'{reuse_cycle_days} days'],
+        ['', ''],
+        ['HOW TO USE THIS FILE', ''],
+        ['', ''],
+        ['Sheet: Chronological Flow',
+         'Shows every concrete pour in date order. '
+         '"Frame ID" is the physical formwork set to send to site that day. '
+         '"Pour #" is the sequence number across the whole project.'],
+        ['Sheet: Frame Register',
+         'One row per use of each physical frame. '
+         'Use this as a dispatch log — tick off each row as the frame leaves the yard.'],
+        ['Sheet: Kit Summary',
+         'One row per Frame ID — how many times it was reused, total active days, '
+         'and efficiency %. High efficiency = good design standardisation.'],
+        ['Sheet: By Element Type',
+         'Columns, Slabs and Beams separated for clarity.'],
+        ['', ''],
+        ['GLOSSARY', ''],
+        ['Frame ID',      'Unique name for one physical formwork set, e.g. CL-001_Kit-02'],
+        ['Element ID',    'The structural element being cast (maps back to your drawing number)'],
+        ['Reuse #',       'How many times this frame has been used up to and including this pour'],
+        ['Gap (days)',     'Days since this frame was last used. Must be ≥ reuse cycle.'],
+        ['FIRST USE',     'Frame is brand new for this pour'],
+        ['REUSE',         'Frame was previously used on an earlier element'],
+    ]
+    return pd.DataFrame(readme_rows, columns=['Item', 'Description'])
+
+
+@lru_cache(maxsize=8)
+def _readme_sheet_xml(project_name: str, reuse_cycle_days: int) -> bytes:
+    """Pre-rendered README worksheet XML for the raw-XML export path."""
+    return xlsx_sheet_xml(_readme_frame(project_name, reuse_cycle_days))
 
 
 def export_kitting_plan_excel(
@@ -221,6 +391,7 @@ def export_kitting_plan_excel(
     df_kit_summ: pd.DataFrame,
     reuse_cycle_days: int = 7,
     project_name: str = "Project",
+    raw_xml: bool = False,
 ) -> bytes:
     """
     Generate a richly formatted, site-ready Kitting Plan Excel workbook.
@@ -230,15 +401,11 @@ def export_kitting_plan_excel(
       2. Chronological Flow  — every pour in date order: Frame → Element ID
       3. Frame Register — one row per physical kit, all element IDs listed in sequence
       4. By Element Type — separate tables for Columns, Slabs, Beams
-    """
-    import io
-    buf = io.BytesIO()
 
-    try:
-        import xlsxwriter as _xl
-        engine = 'xlsxwriter'
-    except ImportError:
-        engine = 'openpyxl'
+    raw_xml=True writes the sheet XML directly (io_utils.write_xlsx) with no
+    formatting — much faster for plans with tens of thousands of pours.
+    """
+    buf = _open_output()
 
     # ── Prepare Chronological Flow sheet ──────────────────────────────────────
     flow_cols = [c for c in [
@@ -247,8 +414,7 @@ def export_kitting_plan_excel(
         'Reuse_Count', 'Days_Since_Prev'
     ] if c in df_kitted.columns]
 
-    flow = df_kitted[flow_cols].copy()
-    flow = flow.sort_values('Casting_Date').reset_index(drop=True)
+    flow = df_kitted[flow_cols].sort_values('Casting_Date').reset_index(drop=True)
     flow.index = flow.index + 1   # 1-based row numbers
     flow.insert(0, 'Pour #', flow.index)
     flow.rename(columns={
@@ -260,25 +426,29 @@ def export_kitting_plan_excel(
     }, inplace=True)
 
     # ── Prepare Frame Register sheet ───────────────────────────────────────────
-    reg_rows = []
-    for kit_id, grp in df_kitted.groupby('Kit_ID'):
-        grp_sorted = grp.sort_values('Casting_Date')
-        for use_n, (_, row) in enumerate(grp_sorted.iterrows(), 1):
-            reg_rows.append({
-                'Frame ID':           kit_id,
-                'Element Type':       row.get('Type', ''),
-                'Dimensions (LxWxH)': (f"{row.get('Length','?')}×"
-                                       f"{row.get('Width','?')}×"
-                                       f"{row.get('Height','?')} m"),
-                'Use #':              use_n,
-                'Element ID':         row.get('Element_ID', ''),
-                'Floor':              row.get('Floor', ''),
-                'Zone':               row.get('Zone', ''),
-                'Casting Date':       str(row.get('Casting_Date', ''))[:10],
-                'Gap (days)':         int(row.get('Days_Since_Prev', 0)),
-                'Status':             'REUSE' if use_n > 1 else 'FIRST USE',
-            })
-    df_reg = pd.DataFrame(reg_rows)
+    reg = df_kitted.sort_values(['Kit_ID', 'Casting_Date'], kind='stable')
+    use_n = reg.groupby('Kit_ID', sort=False, observed=True).cumcount().to_numpy() + 1
+
+    def _reg_col(name, default):
+        return reg[name].to_numpy() if name in reg.columns else default
+
+    def _dim(name):
+        return reg[name].astype(str) if name in reg.columns else '?'
+
+    df_reg = pd.DataFrame({
+        'Frame ID':           reg['Kit_ID'].to_numpy(),
+        'Element Type':       _reg_col('Type', ''),
+        'Dimensions (LxWxH)': (_dim('Length') + '×' + _dim('Width') + '×'
+                               + _dim('Height') + ' m').to_numpy(),
+        'Use #':              use_n,
+        'Element ID':         _reg_col('Element_ID', ''),
+        'Floor':              _reg_col('Floor', ''),
+        'Zone':               _reg_col('Zone', ''),
+        'Casting Date':       reg['Casting_Date'].astype(str).str[:10].to_numpy(),
+        'Gap (days)':         reg['Days_Since_Prev'].astype(int).to_numpy()
+                              if 'Days_Since_Prev' in reg.columns else 0,
+        'Status':             np.where(use_n > 1, 'REUSE', 'FIRST USE'),
+    })
 
     # ── Prepare Kit Summary sheet ──────────────────────────────────────────────
     summ = df_kit_summ.rename(columns={
@@ -289,88 +459,66 @@ def export_kitting_plan_excel(
     })
 
     # ── README content ─────────────────────────────────────────────────────────
-    readme_rows = [
-        ['SmartForm AI — Formwork Kitting Plan', ''],
-        ['Project:', project_name],
-        ['Reuse Cycle:', f'{reuse_cycle_days} days'],
-        ['', ''],
-        ['HOW TO USE THIS FILE', ''],
-        ['', ''],
-        ['Sheet: Chronological Flow',
-         'Shows every concrete pour in date order. '
-         '"Frame ID" is the physical formwork set to send to site that day. '
-         '"Pour #" is the sequence number across the whole project.'],
-        ['Sheet: Frame Register',
-         'One row per use of each physical frame. '
-         'Use this as a dispatch log — tick off each row as the frame leaves the yard.'],
-        ['Sheet: Kit Summary',
-         'One row per Frame ID — how many times it was reused, total active days, '
-         'and efficiency %. High efficiency = good design standardisation.'],
-        ['Sheet: By Element Type',
-         'Columns, Slabs and Beams separated for clarity.'],
-        ['', ''],
-        ['GLOSSARY', ''],
-        ['Frame ID',      'Unique name for one physical formwork set, e.g. CL-001_Kit-02'],
-        ['Element ID',    'The structural element being cast (maps back to your drawing number)'],
-        ['Reuse #',       'How many times this frame has been used up to and including this pour'],
-        ['Gap (days)',     'Days since this frame was last used. Must be ≥ reuse cycle.'],
-        ['FIRST USE',     'Frame is brand new for this pour'],
-        ['REUSE',         'Frame was previously used on an earlier element'],
-    ]
-    df_readme = pd.DataFrame(readme_rows, columns=['Item', 'Description'])
+    df_readme = _readme_frame(project_name, reuse_cycle_days)
 
-    # ── Write to Excel ─────────────────────────────────────────────────────────
-    with pd.ExcelWriter(buf, engine=engine) as writer:
+    # By Element Type
+    type_sheets = {}
+    if 'Type' in flow.columns:
+        for etype in ('Column', 'Slab', 'Beam'):
+            sub = flow[flow['Type'] == etype]
+            if not sub.empty:
+                type_sheets[f'{etype}s'] = sub
 
-        df_readme.to_excel(writer, sheet_name='README', index=False)
-        flow.to_excel(writer, sheet_name='Chronological Flow', index=False)
-        df_reg.to_excel(writer, sheet_name='Frame Register', index=False)
-        summ.to_excel(writer, sheet_name='Kit Summary', index=False)
+    if raw_xml:
+        write_xlsx({
+            'README': _readme_sheet_xml(project_name, reuse_cycle_days),
+            'Chronological Flow': flow,
+            'Frame Register': df_reg, 'Kit Summary': summ, **type_sheets,
+        }, buf)
+        return _output_bytes(buf)
 
-        # By Element Type
-        for etype, colour in [('Column','#DBEAFE'), ('Slab','#DCFCE7'), ('Beam','#FEF9C3')]:
-            sub = flow[flow['Type'] == etype] if 'Type' in flow.columns else pd.DataFrame()
-            if not sub.empty:
-                sub.to_excel(writer, sheet_name=f'{etype}s', index=False)
-
-        # ── xlsxwriter formatting ──────────────────────────────────────────────
-        if engine == 'xlsxwriter':
-            wb = writer.book
-            type_colours = {'Column': '#BFDBFE', 'Slab': '#BBF7D0', 'Beam': '#FDE68A'}
-            hdr_fmt = wb.add_format({
-                'bold': True, 'bg_color': '#1E3A5F', 'font_color': 'white',
-                'border': 1, 'align': 'center', 'valign': 'vcenter',
-                'text_wrap': True
-            })
-            reuse_fmt = wb.add_format({'bg_color': '#D1FAE5', 'font_color': '#065F46'})
-            first_fmt = wb.add_format({'bg_color': '#EFF6FF', 'font_color': '#1E40AF'})
-            urgent_fmt= wb.add_format({'bold': True, 'font_color': '#B91C1C'})
-
-            # Format Chronological Flow
-            ws_flow = writer.sheets['Chronological Flow']
-            ws_flow.set_column('A:A', 8)   # Pour #
-            ws_flow.set_column('B:B', 12)  # Casting Date
-            ws_flow.set_column('C:C', 30)  # Frame ID
-            ws_flow.set_column('D:D', 14)  # Element ID
-            ws_flow.set_column('E:E', 10)  # Type
-            for col_n, col_name in enumerate(flow.columns):
-                ws_flow.write(0, col_n, col_name, hdr_fmt)
-            ws_flow.freeze_panes(1, 0)
-            ws_flow.autofilter(0, 0, len(flow), len(flow.columns) - 1)
-
-            # Format Frame Register
-            ws_reg = writer.sheets['Frame Register']
-            for col_n, col_name in enumerate(df_reg.columns):
-                ws_reg.write(0, col_n, col_name, hdr_fmt)
-            ws_reg.set_column('A:A', 30)
-            ws_reg.set_column('C:C', 20)
-            ws_reg.set_column('I:I', 10)
-            ws_reg.freeze_panes(1, 0)
-            ws_reg.autofilter(0, 0, len(df_reg), len(df_reg.columns) - 1)
-            # Colour-code REUSE vs FIRST USE
-            status_col = df_reg.columns.get_loc('Status')
-            for row_n, status in enumerate(df_reg['Status'], 1):
-                fmt = reuse_fmt if status == 'REUSE' else first_fmt
-                ws_reg.set_row(row_n, None, fmt)
-
-    return buf.getvalue()
+    # ── Write to Excel ─────────────────────────────────────────────────────────
+    wb = _new_workbook(buf)
+    plain_hdr = _plain_header_fmt(wb)
+
+    if XLSXWRITER_OK:
+        hdr_fmt = wb.add_format({
+            'bold': True, 'bg_color': '#1E3A5F', 'font_color': 'white',
+            'border': 1, 'align': 'center', 'valign': 'vcenter',
+            'text_wrap': True
+        })
+        reuse_fmt = wb.add_format({'bg_color': '#D1FAE5', 'font_color': '#065F46'})
+        first_fmt = wb.add_format({'bg_color': '#EFF6FF', 'font_color': '#1E40AF'})
+        # Colour-code REUSE vs FIRST USE
+        reg_fmts = np.where(df_reg['Status'].to_numpy() == 'REUSE', reuse_fmt, first_fmt)
+    else:
+        hdr_fmt = reg_fmts = None
+
+    _stream_df(wb, 'README', df_readme, plain_hdr)
+    ws_flow = _stream_df(wb, 'Chronological Flow', flow, hdr_fmt)
+    ws_reg  = _stream_df(wb, 'Frame Register', df_reg, hdr_fmt, reg_fmts)
+    _stream_df(wb, 'Kit Summary', summ, plain_hdr)
+
+    for name, sub in type_sheets.items():
+        _stream_df(wb, name, sub, plain_hdr)
+
+    # ── xlsxwriter formatting ──────────────────────────────────────────────────
+    if XLSXWRITER_OK:
+        # Format Chronological Flow
+        ws_flow.set_column('A:A', 8)   # Pour #
+        ws_flow.set_column('B:B', 12)  # Casting Date
+        ws_flow.set_column('C:C', 30)  # Frame ID
+        ws_flow.set_column('D:D', 14)  # Element ID
+        ws_flow.set_column('E:E', 10)  # Type
+        ws_flow.freeze_panes(1, 0)
+        ws_flow.autofilter(0, 0, len(flow), len(flow.columns) - 1)
+
+        # Format Frame Register
+        ws_reg.set_column('A:A', 30)
+        ws_reg.set_column('C:C', 20)
+        ws_reg.set_column('I:I', 10)
+        ws_reg.freeze_panes(1, 0)
+        ws_reg.autofilter(0, 0, len(df_reg), len(df_reg.columns) - 1)
+
+    _close_workbook(wb, buf)
+    return _output_bytes(buf)
@@ -1,6 +1,8 @@
 import pandas as pd
+import numpy as np
 import math
-import pulp
+
+from io_utils import as_datetime
 
 def optimize_formwork_sets(
     df_elements,
@@ -10,7 +12,8 @@ def optimize_formwork_sets(
 ):
     """
     Minimises the number of formwork sets required per cluster (and optionally
-    per zone) using PuLP Integer Linear Programming.
+    per zone).  The ILP  min Z  s.t.  Z ≥ active_pours(day)  has the closed-form
+    optimum  Z = max(peak rolling-window demand, life-limit lower bound).
 
     Parameters
     ----------
@@ -29,39 +32,56 @@ def optimize_formwork_sets(
         Cost_Savings, Cost_Reduction_%,
         Sets_Written_Off, Write_Off_Cost, True_Total_Cost   (Feature 1)
     """
-    df = df_elements.copy()
-    df['Casting_Date'] = pd.to_datetime(df.get('Casting_Date', pd.NaT))
+    df = df_elements.assign(Casting_Date=as_datetime(df_elements.get('Casting_Date', pd.NaT)))
 
     # ── Feature 2: build the grouping key ────────────────────────────────────
     if zone_col and zone_col in df.columns:
-        df['_zone'] = df[zone_col].fillna('Default').astype(str)
+        df['_zone'] = df[zone_col].astype(object).fillna('Default').astype(str)
     else:
         df['_zone'] = 'All'
 
+    for col in ('Cluster_ID', '_zone'):
+        df[col] = df[col].astype('category')
+
     group_keys = ['Cluster_ID', '_zone']
 
     # Daily demand per (cluster, zone, date)
     daily_demand = (
-        df.groupby(group_keys + ['Casting_Date'])
+        df.groupby(group_keys + ['Casting_Date'], observed=True, sort=False)
           .size()
           .reset_index(name='Daily_Pours')
     )
 
-    results = []
-
-    for (cluster, zone), group in daily_demand.groupby(group_keys):
-        min_date = group['Casting_Date'].min()
-        max_date = group['Casting_Date'].max()
-
-        all_dates = pd.date_range(start=min_date, end=max_date)
-        cluster_series = (
-            group.set_index('Casting_Date')['Daily_Pours']
-                 .reindex(all_dates, fill_value=0)
-        )
-        pours_array = cluster_series.values
-        days_count  = len(pours_array)
+    # Per-set costs from the first element row of each (cluster, zone)
+    first_rows  = df.drop_duplicates(group_keys).set_index(group_keys)
+    cost_lookup = first_rows['Formwork_Cost_per_Set'].to_dict()
+    repl_lookup = (first_rows['Replacement_Cost_per_Set'].to_dict()
+                   if 'Replacement_Cost_per_Set' in df.columns else cost_lookup)
+
+    # Per-group results, filled by position; the cost columns are derived
+    # from these in one vectorised pass after the loop
+    groups    = daily_demand.groupby(group_keys, observed=True, sort=False)
+    n_groups  = groups.ngroups
+    keys      = []
+    req_sets  = np.empty(n_groups, dtype=np.int64)
+    naive_sets = np.empty(n_groups, dtype=np.int64)
+
+    for i, (key, group) in enumerate(groups):
+        # Daily pours on a contiguous day axis (zero-filled gaps), indexed by
+        # integer day offset from the cluster's first pour
+        day_num = group['Casting_Date'].values.astype('datetime64[D]').view(np.int64)
+        day_num = day_num - day_num.min()
+        days_count  = int(day_num.max()) + 1
+        pours_array = np.zeros(days_count, dtype=np.int64)
+        pours_array[day_num] = group['Daily_Pours'].values
         total_pours = int(pours_array.sum())
 
+        # Sets in use on day i = pours in the window (i - reuse_cycle_days, i],
+        # read off a prefix sum instead of re-summing every window
+        csum = np.concatenate(([0], np.cumsum(pours_array, dtype=np.int64)))
+        window_start = np.maximum(0, np.arange(days_count) - reuse_cycle_days + 1)
+        active_sums  = csum[1:] - csum[window_start]
+
         # ── Feature 1: life-limit lower bound ────────────────────────────────
         # If max_reuse_count is set, we need at least ceil(total_pours / max_reuse_count) sets
         life_limit_lb = (
@@ -69,65 +89,41 @@ def optimize_formwork_sets(
             if max_reuse_count > 0 else 0
         )
 
-        # ── PuLP LP ──────────────────────────────────────────────────────────
-        try:
-            prob = pulp.LpProblem(f"Sets_{cluster}_{zone}", pulp.LpMinimize)
-            Z = pulp.LpVariable("Required_Sets", lowBound=max(0, life_limit_lb), cat='Integer')
-            prob += Z
-
-            for i in range(days_count):
-                window_start = max(0, i - reuse_cycle_days + 1)
-                active_sum   = int(sum(pours_array[window_start:i + 1]))
-                prob += Z >= active_sum, f"Cap_Day_{i}"
-
-            # Feature 1 explicit constraint (also enforced via lowBound, belt-and-braces)
-            if life_limit_lb > 0:
-                prob += Z >= life_limit_lb, "Life_Limit_LB"
-
-            prob.solve(pulp.PULP_CBC_CMD(msg=False))
-            opt_sets = (
-                int(pulp.value(Z))
-                if pulp.LpStatus[prob.status] == 'Optimal' else life_limit_lb
-            )
-        except Exception:
-            # Pure-Python sliding-window fallback
-            opt_sets = life_limit_lb
-            for i in range(days_count):
-                window_start = max(0, i - reuse_cycle_days + 1)
-                opt_sets = max(opt_sets, int(sum(pours_array[window_start:i + 1])))
-
-        naive_sets = total_pours  # worst case: buy new set for every pour
-
-        # Cost per set for this (cluster, zone) slice
-        mask = (df['Cluster_ID'] == cluster) & (df['_zone'] == zone)
-        cost_per_set = df.loc[mask, 'Formwork_Cost_per_Set'].iloc[0]
-
-        # ── Feature 1: write-off cost ─────────────────────────────────────────
-        if max_reuse_count > 0:
-            sets_written_off = math.floor(total_pours / max_reuse_count)
-        else:
-            sets_written_off = 0
-
-        replacement_cost = df.loc[mask, 'Replacement_Cost_per_Set'].iloc[0] \
-            if 'Replacement_Cost_per_Set' in df.columns else cost_per_set
-        write_off_cost = sets_written_off * replacement_cost
-
-        opt_cost   = opt_sets   * cost_per_set
-        naive_cost = naive_sets * cost_per_set
-
-        results.append({
-            'Cluster_ID':                  cluster,
-            'Zone':                        zone,
-            'Required_Sets':               opt_sets,
-            'Naive_Sets':                  naive_sets,
-            'Optimized_Procurement_Cost':  opt_cost,
-            'Naive_Procurement_Cost':      naive_cost,
-            'Cost_Savings':                naive_cost - opt_cost,
-            'Cost_Reduction_%':            ((naive_cost - opt_cost) / naive_cost * 100) if naive_cost > 0 else 0,
-            # Feature 1 extras
-            'Sets_Written_Off':            sets_written_off,
-            'Write_Off_Cost':              write_off_cost,
-            'True_Total_Cost':             opt_cost + write_off_cost,
-        })
-
-    return pd.DataFrame(results)
+        # ── Minimum sets: peak concurrent demand (closed-form ILP optimum) ──
+        keys.append(key)
+        req_sets[i]   = max(life_limit_lb, int(active_sums.max()))
+        naive_sets[i] = total_pours  # worst case: buy new set for every pour
+
+    # Cost per set for each (cluster, zone) slice
+    cost_per_set     = np.array([cost_lookup[k] for k in keys])
+    replacement_cost = np.array([repl_lookup[k] for k in keys])
+
+    # ── Feature 1: write-off cost ─────────────────────────────────────────────
+    if max_reuse_count > 0:
+        sets_written_off = naive_sets // max_reuse_count
+    else:
+        sets_written_off = np.zeros(n_groups, dtype=np.int64)
+    write_off_cost = sets_written_off * replacement_cost
+
+    opt_cost   = req_sets   * cost_per_set
+    naive_cost = naive_sets * cost_per_set
+    savings    = naive_cost - opt_cost
+    reduction  = np.zeros(n_groups, dtype=np.float64)
+    np.divide(savings, naive_cost, out=reduction, where=naive_cost > 0)
+    reduction *= 100
+
+    # Groups came out in first-seen order; sort the (small) result instead
+    return pd.DataFrame({
+        'Cluster_ID':                  [k[0] for k in keys],
+        'Zone':                        [k[1] for k in keys],
+        'Required_Sets':               req_sets,
+        'Naive_Sets':                  naive_sets,
+        'Optimized_Procurement_Cost':  opt_cost,
+        'Naive_Procurement_Cost':      naive_cost,
+        'Cost_Savings':                savings,
+        'Cost_Reduction_%':            reduction,
+        # Feature 1 extras
+        'Sets_Written_Off':            sets_written_off,
+        'Write_Off_Cost':              write_off_cost,
+        'True_Total_Cost':             opt_cost + write_off_cost,
+    }).sort_values(['Cluster_ID', 'Zone'], ignore_index=True)
@@ -5,9 +5,14 @@ Feature 4 — Procurement Lead Time
 Calculates the latest date a purchase order must be placed for each cluster
 so that formwork sets arrive before the first pour.
 """
+import numpy as np
 import pandas as pd
 from datetime import date
 
+from io_utils import as_datetime
+
+_STATUS_ORDER = ['🔴 URGENT', '🟡 ORDER SOON', '🟢 PLANNED']
+
 
 def generate_procurement_schedule(
     df_optimization: pd.DataFrame,
@@ -38,56 +43,57 @@ def generate_procurement_schedule(
         Cluster_ID, Zone, Sets_To_Order, First_Pour_Date,
         Order_By_Date, Estimated_Cost, Status, Days_Until_Order
     """
-    df = df_elements.copy()
-    df['Casting_Date'] = pd.to_datetime(df['Casting_Date'])
+    df = df_elements.assign(Casting_Date=as_datetime(df_elements['Casting_Date']))
 
     if '_zone' not in df.columns:
         df['_zone'] = df['Zone'] if 'Zone' in df.columns else 'All'
 
+    for col in ('Cluster_ID', '_zone'):
+        df[col] = df[col].astype('category')
+
     today = pd.Timestamp(date.today())
-    records = []
-
-    for _, opt_row in df_optimization.iterrows():
-        cluster = opt_row['Cluster_ID']
-        zone    = opt_row.get('Zone', 'All')
-
-        # Elements belonging to this (cluster, zone)
-        mask = df['Cluster_ID'] == cluster
-        if zone != 'All' and '_zone' in df.columns:
-            mask = mask & (df['_zone'] == zone)
-
-        subset = df.loc[mask]
-        if subset.empty:
-            continue
-
-        first_pour   = subset['Casting_Date'].min()
-        order_by     = first_pour - pd.Timedelta(days=lead_time_days)
-        days_to_order = (order_by - today).days
-
-        # Status classification
-        if days_to_order < 0:
-            status = '🔴 URGENT'
-        elif days_to_order <= lead_time_days:
-            status = '🟡 ORDER SOON'
-        else:
-            status = '🟢 PLANNED'
-
-        records.append({
-            'Cluster_ID':      cluster,
-            'Zone':            zone,
-            'Sets_To_Order':   opt_row['Required_Sets'],
-            'First_Pour_Date': first_pour.strftime('%Y-%m-%d'),
-            'Order_By_Date':   order_by.strftime('%Y-%m-%d'),
-            'Days_Until_Order': days_to_order,
-            'Estimated_Cost':  opt_row['Optimized_Procurement_Cost'],
-            'Status':          status,
-        })
-
-    df_schedule = pd.DataFrame(records)
+
+    # First pour per (cluster, zone) in one pass; zone 'All' rows take the
+    # cluster-wide minimum
+    first_by_zone = (
+        df.groupby(['Cluster_ID', '_zone'], sort=False, observed=True)['Casting_Date']
+          .min()
+          .rename_axis(['Cluster_ID', 'Zone'])
+          .reset_index(name='_first_pour')
+    )
+    first_by_cluster = df.groupby('Cluster_ID', sort=False, observed=True)['Casting_Date'].min()
+
+    opt = df_optimization
+    if 'Zone' not in opt.columns:
+        opt = opt.assign(Zone='All')
+    merged = opt.merge(first_by_zone, on=['Cluster_ID', 'Zone'], how='left')
+    is_all = merged['Zone'] == 'All'
+    merged.loc[is_all, '_first_pour'] = merged.loc[is_all, 'Cluster_ID'].map(first_by_cluster)
+    merged = merged[merged['_first_pour'].notna()]
+
+    first_pour    = merged['_first_pour']
+    order_by      = first_pour - pd.Timedelta(days=lead_time_days)
+    days_to_order = (order_by - today).dt.days
+
+    # Status classification
+    status = np.select(
+        [days_to_order < 0, days_to_order <= lead_time_days],
+        _STATUS_ORDER[:2],
+        default=_STATUS_ORDER[2],
+    )
+
+    df_schedule = pd.DataFrame({
+        'Cluster_ID':      merged['Cluster_ID'],
+        'Zone':            merged['Zone'],
+        'Sets_To_Order':   merged['Required_Sets'],
+        'First_Pour_Date': first_pour.dt.strftime('%Y-%m-%d'),
+        'Order_By_Date':   order_by.dt.strftime('%Y-%m-%d'),
+        'Days_Until_Order': days_to_order,
+        'Estimated_Cost':  merged['Optimized_Procurement_Cost'],
+        'Status':          pd.Categorical(status, categories=_STATUS_ORDER, ordered=True),
+    })
 
     # Sort: URGENT first, then by order date
-    status_order = {'🔴 URGENT': 0, '🟡 ORDER SOON': 1, '🟢 PLANNED': 2}
-    df_schedule['_sort'] = df_schedule['Status'].map(status_order)
-    df_schedule = df_schedule.sort_values(['_sort', 'Order_By_Date']).drop(columns='_sort')
+    df_schedule = df_schedule.sort_values(['Status', 'Order_By_Date'])
 
     return df_schedule.reset_index(drop=True)
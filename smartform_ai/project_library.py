@@ -5,38 +5,150 @@ can learn from them and predict BoQ for new projects.
 
 Storage layout:
   project_library/
-    registry.json          — metadata for all saved projects
+    registry.json          — metadata snapshot for saved projects
+    registry.jsonl         — append-only log of saves / deletes since the snapshot
     <project_id>/
       structural_elements.csv
+      structural_elements.parquet  — same table, typed (written when pyarrow is installed)
 """
-import os, json, shutil, hashlib, re
+import os, json, shutil, hashlib, re, threading
+import numpy as np
 import pandas as pd
 from datetime import datetime
 
-LIBRARY_DIR = os.path.join(os.path.dirname(__file__), "project_library")
-REGISTRY    = os.path.join(LIBRARY_DIR, "registry.json")
+try:
+    import pyarrow as pa
+    PYARROW_OK = True
+except ImportError:
+    PYARROW_OK = False
+
+try:
+    import orjson
+    ORJSON_OK = True
+except ImportError:
+    ORJSON_OK = False
+
+LIBRARY_DIR  = os.path.join(os.path.dirname(__file__), "project_library")
+REGISTRY     = os.path.join(LIBRARY_DIR, "registry.json")
+REGISTRY_LOG = os.path.join(LIBRARY_DIR, "registry.jsonl")
+
+# Parsed registry, reused while the (mtime_ns, size) of registry.json and
+# registry.jsonl are unchanged; 'log_lines' counts records in the log
+_REG_CACHE      = {'key': None, 'data': None, 'log_lines': 0}
+_REG_CACHE_LOCK = threading.Lock()
 
 
 def _ensure_dirs():
     os.makedirs(LIBRARY_DIR, exist_ok=True)
 
 
+def _entry_id(p: dict) -> str:
+    return p.get('id') or p.get('project_id', '')
+
+
+def _file_key(path):
+    try:
+        st = os.stat(path)
+    except FileNotFoundError:
+        return None
+    return (st.st_mtime_ns, st.st_size)
+
+
+def _registry_key():
+    """Change token for the registry files, or None if neither exists."""
+    key = (_file_key(REGISTRY), _file_key(REGISTRY_LOG))
+    return None if key == (None, None) else key
+
+
+def _read_registry():
+    """Snapshot entries with the log replayed on top → (entries, log record count)."""
+    data = []
+    if os.path.exists(REGISTRY):
+        data = _read_json(REGISTRY)
+        # Handle old dict format → convert to list
+        if isinstance(data, dict):
+            data = list(data.values())
+    n_lines = 0
+    tombs   = set()
+    if os.path.exists(REGISTRY_LOG):
+        with open(REGISTRY_LOG, "rb") as f:
+            for line in f:
+                if not line.strip():
+                    continue
+                rec = _json_loads(line)
+                n_lines += 1
+                if '_tomb' in rec:
+                    tombs.add(rec['_tomb'])
+                else:
+                    data.append(rec)
+    if tombs:
+        data = [p for p in data if _entry_id(p) not in tombs]
+    # Older entries carry their id as 'project_id' — expose it as 'id' too
+    data = [p if p.get('id') else {**p, 'id': p.get('project_id', '')} for p in data]
+    return data, n_lines
+
+
+def _json_dumps(obj) -> bytes:
+    """Compact UTF-8 JSON (orjson when installed)."""
+    if ORJSON_OK:
+        return orjson.dumps(obj, option=orjson.OPT_SERIALIZE_NUMPY)
+    return json.dumps(obj, ensure_ascii=False).encode("utf-8")
+
+
+def _json_loads(data):
+    return orjson.loads(data) if ORJSON_OK else json.loads(data)
+
+
+def _read_json(path: str):
+    with open(path, "rb") as f:
+        return _json_loads(f.read())
+
+
+def _write_json_atomic(path: str, obj):
+    """Write obj as compact JSON via a temp file + os.replace, so readers never see a partial file."""
+    tmp = path + ".tmp"
+    with open(tmp, "wb") as f:
+        f.write(_json_dumps(obj))
+    os.replace(tmp, path)
+
+
 def _load_registry() -> list:
+    """Registry entries (a fresh list each call; entries are shared — don't mutate)."""
     _ensure_dirs()
-    if os.path.exists(REGISTRY):
-        with open(REGISTRY, "r", encoding="utf-8") as f:
-            data = json.load(f)
-            # Handle old dict format → convert to list
-            if isinstance(data, dict):
-                return list(data.values())
-            return data
-    return []
+    key = _registry_key()
+    if key is None:
+        return []
+    with _REG_CACHE_LOCK:
+        if _REG_CACHE['key'] != key:
+            data, n_lines = _read_registry()
+            _REG_CACHE.update(key=key, data=data, log_lines=n_lines)
+        return list(_REG_CACHE['data'])
 
 
 def _save_registry(reg: list):
+    """Write reg as the registry.json snapshot and drop the log."""
     _ensure_dirs()
-    with open(REGISTRY, "w", encoding="utf-8") as f:
-        json.dump(reg, f, indent=2, ensure_ascii=False)
+    with _REG_CACHE_LOCK:
+        _write_json_atomic(REGISTRY, reg)
+        if os.path.exists(REGISTRY_LOG):
+            os.remove(REGISTRY_LOG)
+        _REG_CACHE.update(key=_registry_key(), data=list(reg), log_lines=0)
+
+
+def _append_registry(record: dict):
+    """
+    Append one entry (or a {'_tomb': project_id} deletion) to registry.jsonl.
+    The log is folded into the snapshot once it holds more than twice as
+    many records as there are live projects.
+    """
+    _ensure_dirs()
+    with open(REGISTRY_LOG, "ab") as f:
+        f.write(_json_dumps(record) + b"\n")
+    reg = _load_registry()
+    with _REG_CACHE_LOCK:
+        log_lines = _REG_CACHE['log_lines']
+    if log_lines > 2 * len(reg):
+        _save_registry(reg)
 
 
 def _make_id(name: str) -> str:
@@ -45,6 +157,89 @@ def _make_id(name: str) -> str:
     return f"{slug}_{ts}"
 
 
+# Parse dtypes for saved structural_elements.csv columns (dimensions stay
+# float64 so cluster keys and BoQ areas are unchanged by a save/load round trip)
+_ELEMENT_DTYPES = {
+    'Element_ID': object, 'Type': 'category', 'Zone': 'category',
+    'Length': np.float64, 'Width': np.float64, 'Height': np.float64,
+    'Formwork_Cost_per_Set': np.float64, 'Replacement_Cost_per_Set': np.float64,
+}
+
+# list_projects: registry field → display column, in display order
+_LIST_COLUMNS = {
+    'id': 'ID', 'name': 'Name', 'building_type': 'Type', 'city': 'City',
+    'floors': 'Floors', 'floor_area_m2': 'Floor Area (m²)', 'duration_days': 'Duration (d)',
+    'n_total': 'Elements', 'n_clusters': 'Clusters', 'saved_at': 'Saved',
+}
+
+# Training-frame schema: column → dtype, in output order
+_TRAINING_DTYPES = {
+    # Input features
+    'building_type': object,     'floors':        np.int64,
+    'floor_area_m2': np.float64, 'duration_days': np.int64,
+    # Targets — total counts
+    'n_columns': np.int64, 'n_slabs': np.int64, 'n_beams': np.int64,
+    'n_total':   np.int64, 'n_clusters': np.int64,
+    # Targets — avg dimensions
+    'col_length':  np.float64, 'col_width':  np.float64, 'col_height':  np.float64,
+    'slab_length': np.float64, 'slab_width': np.float64, 'slab_height': np.float64,
+    'beam_length': np.float64, 'beam_width': np.float64, 'beam_height': np.float64,
+    # Cost
+    'total_cost': np.float64,
+}
+# Columns copied straight from registry entries / (prefix, entry key) of dim dicts
+_TRAINING_FIELDS = ('building_type', 'floors', 'floor_area_m2', 'duration_days',
+                    'n_columns', 'n_slabs', 'n_beams', 'n_total', 'total_cost')
+_TRAINING_DIMS   = (('col', 'col_dims'), ('slab', 'slab_dims'), ('beam', 'beam_dims'))
+
+def _element_stats(df_elements: pd.DataFrame) -> dict:
+    """Summary stats stored per project for fast access during training."""
+    # One groupby for per-type counts and mean dimensions
+    by_type = (
+        df_elements.groupby('Type', sort=False, observed=True)
+                   .agg(n=('Type', 'size'), length=('Length', 'mean'),
+                        width=('Width', 'mean'), height=('Height', 'mean'))
+                   .reindex(['Column', 'Slab', 'Beam'])
+    )
+    n_by_type = by_type['n'].fillna(0).astype(int)
+    dims = by_type[['length', 'width', 'height']].round(3)
+
+    def _dims(etype):
+        if n_by_type[etype] == 0:
+            return {'length': 0, 'width': 0, 'height': 0}
+        return {k: float(v) for k, v in dims.loc[etype].items()}
+
+    # Unique dimension groups from the actual CSV data
+    dim_cols = [c for c in ['Type', 'Length', 'Width', 'Height'] if c in df_elements.columns]
+    n_clusters = (int(df_elements[dim_cols].drop_duplicates().shape[0])
+                  if dim_cols else len(df_elements))
+    total_cost = (float(df_elements['Formwork_Cost_per_Set'].sum())
+                  if 'Formwork_Cost_per_Set' in df_elements.columns else 0.0)
+    return {
+        'n_columns':  int(n_by_type['Column']),
+        'n_slabs':    int(n_by_type['Slab']),
+        'n_beams':    int(n_by_type['Beam']),
+        'n_total':    len(df_elements),
+        'n_clusters': n_clusters,
+        'col_dims':   _dims('Column'),
+        'slab_dims':  _dims('Slab'),
+        'beam_dims':  _dims('Beam'),
+        'total_cost': total_cost,
+    }
+
+
+def _training_row(p: dict) -> dict:
+    """One get_training_dataframe row from a registry entry."""
+    row = {c: p[c] for c in _TRAINING_FIELDS}
+    row['n_clusters'] = p.get('n_clusters', p['n_columns'] + p['n_slabs'] + p['n_beams'])
+    for prefix, key in _TRAINING_DIMS:
+        d = p[key]
+        row[f'{prefix}_length'] = d['length']
+        row[f'{prefix}_width']  = d['width']
+        row[f'{prefix}_height'] = d['height']
+    return row
+
+
 # ── Public API ─────────────────────────────────────────────────────────────────
 
 def save_project(
@@ -60,7 +255,6 @@ def save_project(
     """
     Save a project to the library. Returns the project_id.
     """
-    reg       = _load_registry()
     proj_id   = _make_id(name)
     proj_dir  = os.path.join(LIBRARY_DIR, proj_id)
     os.makedirs(proj_dir, exist_ok=True)
@@ -68,39 +262,15 @@ def save_project(
     csv_path  = os.path.join(proj_dir, "structural_elements.csv")
     df_elements.to_csv(csv_path, index=False)
 
-    # Derive summary stats for fast access during training
-    def _counts(df):
-        vc = df['Type'].value_counts().to_dict()
-        return {
-            'n_columns': int(vc.get('Column', 0)),
-            'n_slabs':   int(vc.get('Slab',   0)),
-            'n_beams':   int(vc.get('Beam',   0)),
-            'n_total':   len(df),
-        }
-
-    def _avg_dims(df, etype):
-        sub = df[df['Type'] == etype]
-        if sub.empty:
-            return {'length': 0, 'width': 0, 'height': 0}
-        return {
-            'length': round(sub['Length'].mean(), 3),
-            'width':  round(sub['Width'].mean(),  3),
-            'height': round(sub['Height'].mean(), 3),
-        }
-
-    def _total_cost(df):
-        if 'Formwork_Cost_per_Set' in df.columns:
-            return float(df['Formwork_Cost_per_Set'].sum())
-        return 0.0
-
-    def _n_clusters(df):
-        """Count unique dimension groups from the actual CSV data."""
-        dim_cols = [c for c in ['Type', 'Length', 'Width', 'Height'] if c in df.columns]
-        if not dim_cols:
-            return len(df)
-        return int(df[dim_cols].drop_duplicates().shape[0])
-
-    counts = _counts(df_elements)
+    # Typed binary copy for fast reloads; skipped if Arrow can't type a column
+    parquet_path = None
+    if PYARROW_OK:
+        parquet_path = os.path.join(proj_dir, "structural_elements.parquet")
+        try:
+            df_elements.to_parquet(parquet_path, compression='zstd', index=False)
+        except (pa.ArrowException, TypeError, ValueError):
+            parquet_path = None
+
     entry = {
         'id':            proj_id,
         'name':          name,
@@ -112,15 +282,10 @@ def save_project(
         'notes':         notes,
         'saved_at':      datetime.now().isoformat(),
         'csv_path':      csv_path,
-        **counts,
-        'n_clusters':    _n_clusters(df_elements),
-        'col_dims':      _avg_dims(df_elements, 'Column'),
-        'slab_dims':     _avg_dims(df_elements, 'Slab'),
-        'beam_dims':     _avg_dims(df_elements, 'Beam'),
-        'total_cost':    _total_cost(df_elements),
+        'parquet_path':  parquet_path,
+        **_element_stats(df_elements),
     }
-    reg.append(entry)
-    _save_registry(reg)
+    _append_registry(entry)
     return proj_id
 
 
@@ -129,47 +294,53 @@ def list_projects() -> pd.DataFrame:
     reg = _load_registry()
     if not reg:
         return pd.DataFrame()
-    rows = []
-    for p in reg:
-        pid = p.get('id') or p.get('project_id', '')
-        rows.append({
-            'ID':            pid,
-            'Name':          p['name'],
-            'Type':          p['building_type'],
-            'City':          p.get('city', ''),
-            'Floors':        p['floors'],
-            'Floor Area (m²)': p['floor_area_m2'],
-            'Duration (d)':  p['duration_days'],
-            'Elements':      p['n_total'],
-            'Clusters':      p.get('n_clusters', '—'),
-            'Saved':         p['saved_at'][:10],
-        })
-    return pd.DataFrame(rows)
-
-
-def load_project_df(project_id: str) -> pd.DataFrame:
-    """Load the structural_elements CSV for a saved project."""
+    df = pd.DataFrame.from_records(reg, columns=list(_LIST_COLUMNS)).rename(columns=_LIST_COLUMNS)
+    df['City']     = df['City'].fillna('')
+    clusters = df['Clusters'].astype('Int64').astype(object)
+    clusters[clusters.isna()] = '—'
+    df['Clusters'] = clusters
+    df['Saved']    = df['Saved'].str.slice(0, 10)
+    return df
+
+
+def iter_projects():
+    """Yield the registry entry (metadata + stats dict) of every saved project. Don't mutate them."""
+    yield from _load_registry()
+
+
+def registry_version():
+    """Token that changes whenever a project is saved or deleted; None for an empty library."""
+    return _registry_key()
+
+
+def load_project_df(project_id: str, usecols=None) -> pd.DataFrame:
+    """
+    Load the structural_elements CSV for a saved project.
+    usecols limits the read to those columns (e.g. ['Type', 'Length', 'Width', 'Height']);
+    known columns are parsed straight into their _ELEMENT_DTYPES dtype.
+    Reads the Parquet copy when there is one (and the CSV hasn't been edited since), else the CSV.
+    """
     reg = _load_registry()
     for p in reg:
-        pid = p.get('id') or p.get('project_id', '')
+        pid = _entry_id(p)
         if pid == project_id:
-            return pd.read_csv(p['csv_path'])
+            dtype = {c: dt for c, dt in _ELEMENT_DTYPES.items() if usecols is None or c in usecols}
+            parquet_path = p.get('parquet_path')
+            if (PYARROW_OK and parquet_path and os.path.exists(parquet_path)
+                    and os.path.getmtime(parquet_path) >= os.path.getmtime(p['csv_path'])):
+                df = pd.read_parquet(parquet_path, columns=usecols)
+                return df.astype({c: dt for c, dt in dtype.items() if c in df.columns})
+            return pd.read_csv(p['csv_path'], usecols=usecols, dtype=dtype, engine='c')
     raise KeyError(f"Project {project_id!r} not found in library.")
 
 
 def delete_project(project_id: str):
     """Remove a project from the library."""
-    reg = _load_registry()
-    new_reg = []
-    for p in reg:
-        pid = p.get('id') or p.get('project_id', '')
-        if pid == project_id:
-            proj_dir = os.path.join(LIBRARY_DIR, project_id)
-            if os.path.isdir(proj_dir):
-                shutil.rmtree(proj_dir)
-        else:
-            new_reg.append(p)
-    _save_registry(new_reg)
+    if any(_entry_id(p) == project_id for p in _load_registry()):
+        proj_dir = os.path.join(LIBRARY_DIR, project_id)
+        if os.path.isdir(proj_dir):
+            shutil.rmtree(proj_dir)
+        _append_registry({'_tomb': project_id})
 
 
 def get_training_dataframe() -> pd.DataFrame:
@@ -178,31 +349,10 @@ def get_training_dataframe() -> pd.DataFrame:
     Each row = one project's aggregated stats.
     """
     reg = _load_registry()
-    rows = []
-    for p in reg:
-        rows.append({
-            # Input features
-            'building_type':  p['building_type'],
-            'floors':         p['floors'],
-            'floor_area_m2':  p['floor_area_m2'],
-            'duration_days':  p['duration_days'],
-            # Targets — total counts
-            'n_columns':      p['n_columns'],
-            'n_slabs':        p['n_slabs'],
-            'n_beams':        p['n_beams'],
-            'n_total':        p['n_total'],
-            'n_clusters':     p.get('n_clusters', p['n_columns'] + p['n_slabs'] + p['n_beams']),
-            # Targets — avg dimensions
-            'col_length':     p['col_dims']['length'],
-            'col_width':      p['col_dims']['width'],
-            'col_height':     p['col_dims']['height'],
-            'slab_length':    p['slab_dims']['length'],
-            'slab_width':     p['slab_dims']['width'],
-            'slab_height':    p['slab_dims']['height'],
-            'beam_length':    p['beam_dims']['length'],
-            'beam_width':     p['beam_dims']['width'],
-            'beam_height':    p['beam_dims']['height'],
-            # Cost
-            'total_cost':     p['total_cost'],
-        })
-    return pd.DataFrame(rows)
+    n   = len(reg)
+    cols = {c: np.empty(n, dtype=dt) for c, dt in _TRAINING_DTYPES.items()}
+    for i, p in enumerate(reg):
+        row = _training_row(p)
+        for c, arr in cols.items():
+            arr[i] = row[c]
+    return pd.DataFrame(cols)
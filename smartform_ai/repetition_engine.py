@@ -1,29 +1,83 @@
+import hashlib
+import threading
+from collections import OrderedDict
+
+import numpy as np
 import pandas as pd
-import matplotlib.pyplot as plt
+from matplotlib.figure import Figure
+
+_GROUP_COLS = ['Type', 'Length', 'Width', 'Height']
+
+# Grouping results — (per-row Cluster_ID codes, cluster_summary) — keyed by a
+# fingerprint of the Type/L/W/H columns (LRU, newest last)
+_REP_CACHE: OrderedDict = OrderedDict()
+_REP_CACHE_MAX  = 32
+_REP_CACHE_LOCK = threading.Lock()
+
+
+def _group_key(keys: pd.DataFrame):
+    """Fingerprint of the grouping columns: Type as factorized codes + labels, L/W/H as value hashes."""
+    type_codes, type_values = pd.factorize(keys['Type'])
+    dim_hashes = pd.util.hash_pandas_object(keys[_GROUP_COLS[1:]], index=False).to_numpy()
+    h = hashlib.blake2b(type_codes.tobytes(), digest_size=16)
+    h.update(dim_hashes.tobytes())
+    return tuple(map(str, keys.dtypes)), tuple(type_values), h.digest()
+
 
 def detect_repetitions(df_elements):
     """
     Groups elements by Type + Dimensions to find repeating formwork sets.
+    The grouping is memoised on the Type/L/W/H values; callers always get fresh frames.
     """
-    df = df_elements.copy()
-    
-    # Group by structural properties
-    group_cols = ['Type', 'Length', 'Width', 'Height']
-    cluster_summary = df.groupby(group_cols).size().reset_index(name='Frequency')
+    keys = df_elements[_GROUP_COLS]
+    key  = _group_key(keys)
+    with _REP_CACHE_LOCK:
+        hit = _REP_CACHE.get(key)
+        if hit is not None:
+            _REP_CACHE.move_to_end(key)
+    if hit is None:
+        hit = _group_repetitions(keys)
+        with _REP_CACHE_LOCK:
+            _REP_CACHE[key] = hit
+            if len(_REP_CACHE) > _REP_CACHE_MAX:
+                _REP_CACHE.popitem(last=False)
+    row_codes, cluster_summary = hit
+
+    df = df_elements.reset_index(drop=True)
+    df['Cluster_ID'] = pd.Categorical.from_codes(row_codes,
+                                                 dtype=cluster_summary['Cluster_ID'].dtype)
+    return df, cluster_summary.copy()
+
+
+def _group_repetitions(keys):
+    """Cluster_ID category code for every row of keys, and the ranked cluster summary."""
+    # One grouping pass: ngroup() gives every row its (sorted) group code
+    # and size() the matching frequencies — no merge back onto the rows
+    grouper = keys.groupby(_GROUP_COLS, observed=True)
+    codes   = grouper.ngroup().to_numpy()
+    cluster_summary = grouper.size().reset_index(name='Frequency')
     
     # Sort by most frequent
-    cluster_summary = cluster_summary.sort_values(by='Frequency', ascending=False).reset_index(drop=True)
+    cluster_summary = cluster_summary.sort_values(by='Frequency', ascending=False)
+    order = cluster_summary.index.to_numpy()      # group code of each ranked row
+    cluster_summary = cluster_summary.reset_index(drop=True)
     
-    # Assign Cluster IDs
-    cluster_summary['Cluster_ID'] = [f"CL-{(i+1):03d}" for i in range(len(cluster_summary))]
+    # Assign Cluster IDs (built in NumPy, stored as a category)
+    ids = np.char.add('CL-', np.char.zfill(np.arange(1, len(cluster_summary) + 1).astype(str), 3))
+    cluster_ids = pd.Categorical(ids)
+    cluster_summary['Cluster_ID'] = cluster_ids
     
-    # Merge back to assign Cluster_ID to every element
-    df = df.merge(cluster_summary[group_cols + ['Cluster_ID']], on=group_cols, how='left')
+    # Group code → Cluster_ID category code; rows with a missing key (code NaN / -1) get -1
+    code_to_cat = np.empty(len(order) + 1, dtype=np.int64)
+    code_to_cat[order] = cluster_ids.codes
+    code_to_cat[-1]    = -1
+    codes = np.where(pd.isna(codes), -1, codes).astype(np.int64)
     
-    return df, cluster_summary
+    return code_to_cat[codes], cluster_summary
 
 def plot_repetition_bar_chart(cluster_summary):
-    fig, ax = plt.subplots(figsize=(10, 5))
+    fig = Figure(figsize=(10, 5))
+    ax = fig.subplots()
     
     # Limit to top 10 clusters for cleaner visualization
     top_clusters = cluster_summary.head(10)
@@ -33,7 +87,7 @@ def plot_repetition_bar_chart(cluster_summary):
     ax.set_xlabel('Cluster ID (Type + Dimensions)', fontsize=12)
     ax.set_ylabel('Repetition Count', fontsize=12)
     
-    plt.xticks(rotation=45)
-    plt.tight_layout()
+    ax.tick_params(axis='x', labelrotation=45)
+    fig.tight_layout()
     
     return fig
@@ -3,9 +3,19 @@ revit_importer.py
 Parses Autodesk Revit schedule exports (.csv or .xlsx) and maps columns
 to SmartForm AI's structural_elements format.
 """
+import re
+from functools import lru_cache
+import numpy as np
 import pandas as pd
 import io
 from datetime import datetime
+from pandas.api.types import is_bool_dtype, is_numeric_dtype
+
+try:
+    import ahocorasick
+    AHOCORASICK_OK = True
+except ImportError:
+    AHOCORASICK_OK = False
 
 
 # ── Revit AIA layer/family name → SmartForm type ─────────────────────────────
@@ -25,13 +35,48 @@ _TYPE_KEYWORDS = {
     'lintel':  'Beam',
 }
 
+# Compiled keyword alternation per target type, in _TYPE_KEYWORDS priority order
+# (keywords are grouped by type, so "first type with any hit" = first keyword hit)
+_TYPE_RES = {
+    t: re.compile('|'.join(re.escape(kw) for kw, kt in _TYPE_KEYWORDS.items() if kt == t))
+    for t in dict.fromkeys(_TYPE_KEYWORDS.values())
+}
+_FLOOR_RE = re.compile(r'(\d+)')
+
+# With pyahocorasick: one automaton finds every keyword in a single scan;
+# each hit carries its _TYPE_KEYWORDS rank so the first-listed keyword still wins
+if AHOCORASICK_OK:
+    _TYPE_AUTOMATON = ahocorasick.Automaton()
+    for _rank, (_kw, _t) in enumerate(_TYPE_KEYWORDS.items()):
+        _TYPE_AUTOMATON.add_word(_kw, (_rank, _t))
+    _TYPE_AUTOMATON.make_automaton()
+
+# Categories of the converted Type column (sorted, so groupby order matches plain strings)
+_ELEMENT_TYPES = sorted(_TYPE_RES)
+
+@lru_cache(maxsize=4096)
 def _infer_type(value: str) -> str:
     v = str(value).lower()
-    for kw, t in _TYPE_KEYWORDS.items():
-        if kw in v:
+    if AHOCORASICK_OK:
+        hits = [hit for _, hit in _TYPE_AUTOMATON.iter(v)]
+        return min(hits)[1] if hits else 'Column'
+    for t, rx in _TYPE_RES.items():
+        if rx.search(v):
             return t
     return 'Column'   # safe default
 
+def _to_metres_vec(values: pd.Series, unit='mm') -> pd.Series:
+    """Vectorised _to_metres: unparseable values become NaN."""
+    if is_numeric_dtype(values) and not is_bool_dtype(values):
+        v = values.astype(float)
+    else:
+        v = pd.to_numeric(values.astype(str).str.replace(',', '').str.strip(), errors='coerce')
+    if unit == 'mm':
+        v = v / 1000
+    elif unit == 'ft':
+        v = v * 0.3048
+    return v.round(4)
+
 def _to_metres(value, unit='mm'):
     """Convert a dimension value to metres."""
     try:
@@ -45,6 +90,27 @@ def _to_metres(value, unit='mm'):
     return round(v, 4)          # assume already metres
 
 
+def _header_names(header: pd.Series) -> list:
+    """Column names from a raw header row, named/deduplicated the way read_excel does."""
+    names = [int(v) if isinstance(v, float) and v.is_integer() else v for v in header]
+    unnamed = [i for i, v in enumerate(names) if pd.isna(v)]
+    for i in unnamed:
+        names[i] = f'Unnamed: {i}'
+    # Named columns first, then unnamed ones; clashes get '.1', '.2', ...
+    taken, counts = set(names), {}
+    order = [i for i in range(len(names)) if i not in set(unnamed)] + unnamed
+    for i in order:
+        base = name = names[i]
+        n = counts.get(name, 0)
+        while n > 0:
+            counts[base] = n + 1
+            name = f'{base}.{n}'
+            n = n + 1 if name in taken else counts.get(name, 0)
+        names[i] = name
+        counts[name] = n + 1
+    return names
+
+
 def load_revit_file(file_obj, filename: str) -> pd.DataFrame:
     """
     Load a raw Revit schedule export.
@@ -54,27 +120,47 @@ def load_revit_file(file_obj, filename: str) -> pd.DataFrame:
     Returns a raw DataFrame with original Revit column names.
     """
     if filename.endswith('.xlsx') or filename.endswith('.xls'):
-        # Try to find the real header row (first row with more than 2 non-null values)
+        # Parse the sheet once; the real header row is the first row with
+        # at least 3 non-null values, everything below it is data
         raw = pd.read_excel(file_obj, header=None)
-        header_row = 0
-        for i, row in raw.iterrows():
-            if row.notna().sum() >= 3:
-                header_row = i
-                break
-        df = pd.read_excel(io.BytesIO(file_obj.getvalue()) if hasattr(file_obj, 'getvalue') else file_obj,
-                           header=header_row)
+        wide = raw.notna().sum(axis=1).to_numpy() >= 3
+        header_row = int(wide.argmax()) if wide.any() else 0
+        df = raw.iloc[header_row + 1:].reset_index(drop=True).infer_objects()
+        # A float column in raw may only be float because of its header /
+        # title cells; read_excel gives whole-number cells as ints
+        for c in df.columns[(df.dtypes == float).to_numpy()]:
+            v = df[c]
+            if v.notna().all() and (v == v.round()).all():
+                df[c] = v.astype('int64')
+        # read_excel parses numeric-looking text ('3.5e3') in a column whose
+        # data cells all convert; do the same for columns still object here
+        for c in df.columns[(df.dtypes == object).to_numpy()]:
+            v = df[c]
+            if v.notna().any():
+                try:
+                    df[c] = pd.to_numeric(v)
+                except (ValueError, TypeError):
+                    pass
+        df.columns = _header_names(raw.iloc[header_row])
     else:
         # CSV — skip schedule-name rows until real headers found
         raw_text = file_obj.read().decode('utf-8', errors='replace') \
             if hasattr(file_obj, 'read') else open(file_obj, encoding='utf-8').read()
-        lines = raw_text.splitlines()
-        header_idx = 0
-        for i, line in enumerate(lines):
-            cols = [c.strip() for c in line.split(',') if c.strip()]
+        # Walk line starts with str.find — no list of lines, no re-joined copy
+        eol = '\n' if '\n' in raw_text else '\r'
+        header_pos = pos = 0
+        while pos < len(raw_text):
+            end = raw_text.find(eol, pos)
+            if end < 0:
+                end = len(raw_text)
+            cols = [c.strip() for c in raw_text[pos:end].split(',') if c.strip()]
             if len(cols) >= 3:
-                header_idx = i
+                header_pos = pos
                 break
-        df = pd.read_csv(io.StringIO('\n'.join(lines[header_idx:])))
+            pos = end + 1
+        buf = io.StringIO(raw_text)
+        buf.seek(header_pos)
+        df = pd.read_csv(buf, engine='c', low_memory=False)
 
     df.columns = [str(c).strip() for c in df.columns]
     return df
@@ -131,46 +217,68 @@ def convert_revit_to_smartform(
     if default_date is None:
         default_date = datetime.today().strftime('%Y-%m-%d')
 
-    rows = []
-    for idx, row in df.iterrows():
-        def get(field, fallback=None):
-            col = mapping.get(field)
-            return row[col] if (col and col in row.index and pd.notna(row[col])) else fallback
-
-        raw_type = get('type', 'Column')
-        elem_type = _infer_type(raw_type)
-
-        length = _to_metres(get('length', 0.5 if elem_type == 'Column' else 5.0), unit)
-        width  = _to_metres(get('width',  0.5 if elem_type == 'Column' else 0.3), unit)
-        height = _to_metres(get('height', 3.0 if elem_type != 'Slab'   else 0.2), unit)
-
-        if None in (length, width, height):
-            continue
-
-        # Floor: try to extract numeric part
-        floor_raw = str(get('floor', '1'))
-        import re
-        floor_nums = re.findall(r'\d+', floor_raw)
-        floor = int(floor_nums[0]) if floor_nums else 1
-
-        zone  = str(get('zone', default_zone)).strip() or default_zone
-        date  = str(get('date', default_date)).strip()[:10]
-        cost  = float(get('cost', default_cost) or default_cost)
-        elem_id = str(get('id', f"RVT-{idx+1:03d}"))
-
-        rows.append({
-            'Element_ID':             elem_id,
-            'Type':                   elem_type,
-            'Length':                 length,
-            'Width':                  width,
-            'Height':                 height,
-            'Floor':                  floor,
-            'Zone':                   zone,
-            'Casting_Date':           date,
-            'Formwork_Cost_per_Set':  cost,
-            'Replacement_Cost_per_Set': round(cost * 0.85, 0),
-            'Max_Reuse_Count':        10,
-            '_source':                'Revit',
-        })
-
-    return pd.DataFrame(rows)
+    # Fields whose mapped column actually exists, resolved once
+    active = {f: col for f, col in mapping.items() if col and col in df.columns}
+
+    def field(name, fallback):
+        """Mapped column with nulls replaced by fallback (all fallback if unmapped)."""
+        if not isinstance(fallback, pd.Series):
+            fallback = pd.Series(fallback, index=df.index, dtype=object)
+        if name in active:
+            col     = df[active[name]]
+            missing = col.isna()
+            # Fill from the fallback side: col.where(...) would silently downcast
+            return fallback.where(missing, col) if missing.any() else col
+        return fallback
+
+    # Revit schedules repeat a handful of family / zone names: do the string
+    # work once per distinct value and broadcast it back through the codes
+    type_codes, raw_types = pd.factorize(field('type', 'Column').astype(str))
+    type_index = np.array([_ELEMENT_TYPES.index(_infer_type(v)) for v in raw_types],
+                          dtype=np.int8)
+    elem_type = pd.Categorical.from_codes(type_index[type_codes], categories=_ELEMENT_TYPES)
+    is_column = elem_type == 'Column'
+    is_slab   = elem_type == 'Slab'
+
+    def dim(name, fallback):
+        return _to_metres_vec(field(name, pd.Series(fallback, index=df.index)), unit)
+
+    length = dim('length', np.where(is_column, 0.5, 5.0))
+    width  = dim('width',  np.where(is_column, 0.5, 0.3))
+    height = dim('height', np.where(is_slab,   0.2, 3.0))
+
+    # Floor: numeric part of the level name
+    floor = (field('floor', '1').astype(str)
+             .str.extract(_FLOOR_RE, expand=False)
+             .fillna('1').astype(int))
+
+    zone_codes, zones = pd.factorize(field('zone', default_zone).astype(str))
+    zones = zones.str.strip()
+    zone  = pd.Series(zones.where(zones != '', default_zone).to_numpy(dtype=object)[zone_codes],
+                      index=df.index)
+    date = field('date', default_date).astype(str).str.strip().str[:10]
+
+    cost = pd.to_numeric(field('cost', default_cost), errors='coerce')
+    cost = cost.where(cost.notna() & (cost != 0), default_cost).astype(float)
+
+    default_ids = np.char.add('RVT-', np.char.zfill((df.index.to_numpy() + 1).astype(str), 3))
+    elem_id = field('id', pd.Series(default_ids, index=df.index)).astype(str)
+
+    out = pd.DataFrame({
+        'Element_ID':             elem_id,
+        'Type':                   elem_type,
+        'Length':                 length,
+        'Width':                  width,
+        'Height':                 height,
+        'Floor':                  floor,
+        'Zone':                   zone,
+        'Casting_Date':           date,
+        'Formwork_Cost_per_Set':  cost,
+        'Replacement_Cost_per_Set': (cost * 0.85).round(0),
+        'Max_Reuse_Count':        10,
+        '_source':                'Revit',
+    }, index=df.index)
+
+    # Rows whose dimensions could not be parsed are skipped
+    keep = length.notna() & width.notna() & height.notna()
+    return out[keep].reset_index(drop=True)